@@ -30,17 +30,21 @@ class Seed(object):
     def faker(cls, locale=None, codename=None):
         code = codename or cls.codename(locale)
         if code not in cls.fakers:
-            from faker import Faker
-            cls.fakers[code] = Faker(locale)
-            cls.fakers[code].seed_instance(random.randint(1, 10000))
+            # Faker is only loaded once the faker is used
+            from django_seed.providers import LazyFaker
+            cls.fakers[code] = LazyFaker(locale, random.randint(1, 10000))
         return cls.fakers[code]
 
     @classmethod
-    def seeder(cls, locale=None):
+    def seeder(cls, locale=None, pool_size=None):
         code = cls.codename(locale)
+        faker = cls.fakers.get(code, None) or cls.faker(codename=code)
+        from django_seed import seeder
+
+        # A pool size gets its own seeder, the shared one is left as it is
+        if pool_size is not None:
+            return seeder.Seeder(faker, pool_size=pool_size)
+
         if code not in cls.seeders:
-            faker = cls.fakers.get(code, None) or cls.faker(codename=code)
-            from django_seed import seeder
             cls.seeders[code] = seeder.Seeder(faker)
-
         return cls.seeders[code]
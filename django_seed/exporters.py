@@ -0,0 +1,173 @@
+from contextlib import contextmanager
+import csv
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.encoding import is_protected_type
+
+from django_seed.exceptions import SeederException
+
+
+def field_value(obj, field):
+    """
+    The value of $field like Django's serializers output it, so that the
+    exported fixtures can be loaded with loaddata
+    """
+    if field.remote_field is not None:
+        return getattr(obj, field.attname)
+
+    value = field.value_from_object(obj)
+    if is_protected_type(value):
+        return value
+    return field.value_to_string(obj)
+
+
+def table_records(model, faker_data, relations):
+    """
+    The records of a generated row, one per table of $model: the tables of
+    its multi-table inheritance parents first, then its own table
+    :param faker_data: The values of the row, with its PK
+    :param relations: The related PKs of each many-to-many field, or None
+    :rtype: A generator of (table model, pk, dict of values by field name)
+    """
+    obj = model(**faker_data)
+
+    for table in list(reversed(model._meta.get_parent_list())) + [model]:
+        opts = table._meta
+        fields = {
+            field.name: field_value(obj, field)
+            for field in opts.local_concrete_fields
+            if not field.primary_key
+        }
+        if relations:
+            for field in opts.local_many_to_many:
+                fields[field.name] = list(dict.fromkeys(relations[field.name]))
+
+        yield table, getattr(obj, opts.pk.attname), fields
+
+
+class JSONLinesExporter(object):
+    """
+    Writes every record as a line of JSON, with the same model, pk and
+    fields keys as Django fixtures
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def record(self, table, pk, fields):
+        return json.dumps(
+            {"model": table._meta.label_lower, "pk": pk, "fields": fields},
+            cls=DjangoJSONEncoder,
+        )
+
+    def write_row(self, model, faker_data, relations):
+        for table, pk, fields in table_records(model, faker_data, relations):
+            self.stream.write(self.record(table, pk, fields))
+            self.stream.write("\n")
+
+    def close(self):
+        pass
+
+
+class FixtureExporter(JSONLinesExporter):
+    """
+    Writes the records as a Django fixture, a JSON array loadable with
+    loaddata, one record at a time
+    """
+
+    def __init__(self, stream):
+        super(FixtureExporter, self).__init__(stream)
+        self.separator = "[\n"
+
+    def write_row(self, model, faker_data, relations):
+        for table, pk, fields in table_records(model, faker_data, relations):
+            self.stream.write(self.separator)
+            self.stream.write(self.record(table, pk, fields))
+            self.separator = ",\n"
+
+    def close(self):
+        self.stream.write("[]\n" if self.separator == "[\n" else "\n]\n")
+
+
+class CSVExporter(object):
+    """
+    Writes the records of each table to its own `app_label.model.csv` file
+    in $directory, with a header row. Many-to-many fields are written as
+    JSON lists of PKs.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+        self.writers = {}
+
+    def writer(self, table, fields):
+        if table not in self.writers:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, "{}.csv".format(table._meta.label_lower))
+            self.files[table] = open(path, "w", newline="")
+            self.writers[table] = csv.writer(self.files[table])
+            self.writers[table].writerow(["pk"] + list(fields))
+        return self.writers[table]
+
+    def write_row(self, model, faker_data, relations):
+        for table, pk, fields in table_records(model, faker_data, relations):
+            values = [
+                json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (list, dict)) else value
+                for value in fields.values()
+            ]
+            self.writer(table, fields).writerow([pk] + values)
+
+    def close(self):
+        for output in self.files.values():
+            output.close()
+
+
+EXPORTERS = {
+    "json": FixtureExporter,
+    "jsonl": JSONLinesExporter,
+    "csv": CSVExporter,
+}
+
+
+@contextmanager
+def open_exporter(output, format=None):
+    """
+    :param output: A directory for "csv", a path or a text stream for the
+    other formats
+    :param format: "json" (a Django fixture), "jsonl" or "csv", guessed from
+    the extension of a path $output when not given
+    """
+    if not isinstance(output, str):
+        # A stream has no extension to guess the format from, and no
+        # directory to write the CSV files in
+        if format is None or format == "csv":
+            message = "Cannot export to a stream in {} format, expected one of {}".format(
+                format, tuple(name for name in EXPORTERS if name != "csv")
+            )
+            raise SeederException(message)
+    elif format is None:
+        extension = os.path.splitext(output)[1].lstrip(".")
+        format = extension if extension in EXPORTERS else "csv" if not extension else None
+
+    if format not in EXPORTERS:
+        message = "Unknown export format for {}, expected one of {}".format(output, tuple(EXPORTERS))
+        raise SeederException(message)
+
+    if format == "csv":
+        exporter = CSVExporter(output)
+        try:
+            yield exporter
+        finally:
+            exporter.close()
+    elif isinstance(output, str):
+        with open(output, "w") as stream:
+            exporter = EXPORTERS[format](stream)
+            yield exporter
+            exporter.close()
+    else:
+        exporter = EXPORTERS[format](output)
+        yield exporter
+        exporter.close()
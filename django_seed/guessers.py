@@ -1,19 +1,16 @@
-from django.db.models import *
-try:
-    # JSONField is not defined in Django versions < 2 or might be in
-    # another import path for versions >= 2.
-    from django.db.models import JSONField
-except ImportError:
-    from django.contrib.postgres.fields import JSONField
 from django.conf import settings
+from django.db import models
 from django.core.validators import validate_comma_separated_integer_list
 from django.utils import timezone
-from django.contrib.postgres.fields import ArrayField
+from django.dispatch import Signal
 
 import random
-import re
 
-from .providers import Provider
+from .providers import ColumnProvider, Provider
+
+
+# Sent with the guesser class as sender when a format is registered
+format_registered = Signal()
 
 
 def _timezone_format(value):
@@ -28,10 +25,124 @@ def _timezone_format(value):
     return value
 
 
+def _timezone_format_column(values):
+    if getattr(settings, 'USE_TZ', False):
+        return [_timezone_format(value) for value in values]
+    return values
+
+
+class BatchFormatter(object):
+    """
+    A field formatter that can also generate a whole column of values at
+    once with `batch(n)`. Calling it generates the value of a single row,
+    like any other formatter.
+    """
+
+    def __init__(self, row, batch):
+        self.row = row
+        self.batch = batch
+
+    def __call__(self, inserted_entities):
+        return self.row(inserted_entities)
+
+
+class PooledFormatter(BatchFormatter):
+    """
+    Samples the values of an expensive formatter from a pool of up to $size
+    distinct pre-generated values. Every $refresh draws, a random value of the
+    pool is evicted and replaced with a freshly generated one, so the pool
+    slowly changes while its memory stays bounded.
+    """
+
+    def __init__(self, formatter, size, refresh=100):
+        super(PooledFormatter, self).__init__(self.sample, self.sample_column)
+        self.formatter = formatter
+        self.size = size
+        self.refresh = refresh
+        self.values = None
+        self.draws = 0
+
+    def fill(self, inserted_entities):
+        values = []
+        seen = set()
+
+        # Give up on distinct values after a while, e.g. a boolean formatter
+        # can only ever generate two
+        for _ in range(self.size * 2):
+            value = self.formatter(inserted_entities)
+            try:
+                if value in seen:
+                    continue
+                seen.add(value)
+            except TypeError:
+                pass
+            values.append(value)
+            if len(values) == self.size:
+                break
+
+        self.values = values
+
+    def draw(self, inserted_entities, number):
+        if self.values is None:
+            self.fill(inserted_entities)
+
+        if self.refresh:
+            draws = self.draws + number
+            for _ in range(draws // self.refresh - self.draws // self.refresh):
+                index = random.randrange(len(self.values))
+                self.values[index] = self.formatter(inserted_entities)
+            self.draws = draws
+
+    def sample(self, inserted_entities):
+        self.draw(inserted_entities, 1)
+        return random.choice(self.values)
+
+    def sample_column(self, number):
+        self.draw({}, number)
+        return random.choices(self.values, k=number)
+
+
 class NameGuesser(object):
+    """
+    Guesses a faker method from the name of a field. Exact names are looked
+    up in a dict, then the prefix and suffix rules are tried in order.
+    Formats are registered as functions taking the guesser and returning the
+    formatter.
+    """
+
+    names = {}
+    prefixes = []
+    suffixes = []
 
     def __init__(self, faker):
         self.faker = faker
+        self.columns = ColumnProvider(faker)
+
+    @classmethod
+    def register(cls, names, format=None, prefix=False, suffix=False):
+        """
+        Register the format of fields named $names, or of the fields whose
+        name starts or ends with them. Can be used as a decorator.
+        :param names: A lowercase name or a tuple of them
+        :param format: A function taking the NameGuesser and returning the
+        formatter, e.g. a BatchFormatter
+        """
+        if format is None:
+            return lambda format: cls.register(names, format, prefix, suffix)
+
+        if isinstance(names, str):
+            names = (names,)
+
+        for name in names:
+            if prefix:
+                cls.prefixes.append((name, format))
+            elif suffix:
+                cls.suffixes.append((name, format))
+            else:
+                cls.names[name] = format
+
+        format_registered.send(sender=cls)
+        return format
 
     def guess_format(self, name):
         """
@@ -39,27 +150,78 @@ class NameGuesser(object):
         :param name:
         """
         name = name.lower()
-        faker = self.faker
-        if re.findall(r'^is[_A-Z]', name): return lambda x: faker.boolean()
-        elif re.findall(r'(_a|A)t$', name): return lambda x: _timezone_format(faker.date_time())
-
-        if name in ('first_name', 'firstname', 'first'): return lambda x: faker.first_name()
-        if name in ('last_name', 'lastname', 'last'): return lambda x: faker.last_name()
-
-        if name in ('username', 'login', 'nickname'): return lambda x:faker.user_name()
-        if name in ('email', 'email_address'): return lambda x:faker.email()
-        if name in ('phone_number', 'phonenumber', 'phone'): return lambda x:faker.phone_number()
-        if name == 'address': return lambda x:faker.address()
-        if name == 'city': return lambda x: faker.city()
-        if name == 'streetaddress': return lambda x: faker.street_address()
-        if name in ('postcode', 'zipcode'): return lambda x: faker.postcode()
-        if name == 'state': return lambda x: faker.state()
-        if name == 'country': return lambda x: faker.country()
-        if name == 'title': return lambda x: faker.sentence()
-        if name in ('body', 'summary', 'description'): return lambda x: faker.text()
+
+        format = self.names.get(name)
+        if format is None:
+            for prefix, prefix_format in self.prefixes:
+                if name.startswith(prefix):
+                    format = prefix_format
+                    break
+            else:
+                for suffix, suffix_format in self.suffixes:
+                    if name.endswith(suffix):
+                        format = suffix_format
+                        break
+
+        if format is not None:
+            return format(self)
+
+
+def _date_time_format(guesser, field=None):
+    faker = guesser.faker
+    columns = guesser.columns
+    return BatchFormatter(
+        lambda x: _timezone_format(faker.date_time()),
+        lambda n: _timezone_format_column(columns.date_time(n)),
+    )
+
+
+def _faker_format(method, column_method=None):
+    """
+    The format of fields generated by the faker method named $method, and
+    by the ColumnProvider method named $column_method in batches
+    """
+    def format(guesser, field=None):
+        faker_method = getattr(guesser.faker, method)
+        row = lambda x: faker_method()
+        if column_method is None:
+            return row
+        return BatchFormatter(row, getattr(guesser.columns, column_method))
+
+    return format
+
+
+NameGuesser.register('is_', _faker_format('boolean', 'boolean'), prefix=True)
+NameGuesser.register('_at', _date_time_format, suffix=True)
+
+for names, method in (
+    (('first_name', 'firstname', 'first'), 'first_name'),
+    (('last_name', 'lastname', 'last'), 'last_name'),
+    (('username', 'login', 'nickname'), 'user_name'),
+    (('email', 'email_address'), 'email'),
+    (('phone_number', 'phonenumber', 'phone'), 'phone_number'),
+    ('address', 'address'),
+    ('city', 'city'),
+    ('streetaddress', 'street_address'),
+    (('postcode', 'zipcode'), 'postcode'),
+    ('state', 'state'),
+    ('country', 'country'),
+    ('title', 'sentence'),
+    (('body', 'summary', 'description'), 'text'),
+):
+    NameGuesser.register(names, _faker_format(method))
 
 
 class FieldTypeGuesser(object):
+    """
+    Guesses a faker method from the class of a field. The format of a field
+    class is looked up along its MRO the first time it is seen and cached,
+    so subclasses of registered fields get the format of their closest
+    registered parent.
+    """
+
+    formats = {}
+    resolved = {}
 
     def __init__(self, faker):
         """
@@ -67,15 +229,49 @@ class FieldTypeGuesser(object):
         """
         self.faker = faker
         self.provider = Provider(self.faker)
+        self.columns = ColumnProvider(self.faker)
+
+    @classmethod
+    def register(cls, field_class, format=None):
+        """
+        Register the format of a field class and its subclasses. Can be used
+        as a decorator.
+        :param field_class: A Field subclass, or the dotted path of its class
+        so that its module is only imported by the models using it
+        :param format: A function taking the FieldTypeGuesser and the field and
+        returning the formatter, e.g. a BatchFormatter to generate whole
+        columns at once
+        """
+        if format is None:
+            return lambda format: cls.register(field_class, format)
+
+        cls.formats[field_class] = format
+        cls.resolved.clear()
+        format_registered.send(sender=cls)
+        return format
+
+    @classmethod
+    def resolve(cls, field_class):
+        """
+        The format registered for $field_class or its closest parent, None
+        when there is none
+        """
+        if field_class not in cls.resolved:
+            format = None
+            for klass in field_class.__mro__:
+                format = cls.formats.get(klass) or cls.formats.get(
+                    '{}.{}'.format(klass.__module__, klass.__qualname__)
+                )
+                if format is not None:
+                    break
+            cls.resolved[field_class] = format
+        return cls.resolved[field_class]
 
     def guess_format(self, field):
         """
         Returns the correct faker function based on the field type
         :param field:
         """
-        faker = self.faker
-        provider = self.provider
-
         if field.choices:
             collected_choices = []
             for choice in field.choices:
@@ -87,54 +283,98 @@ class FieldTypeGuesser(object):
                 else:
                     collected_choices.append(choice)
 
-            return lambda x: random.choice(collected_choices)[0]
-
-        if isinstance(field, DurationField): return lambda x: provider.duration()
-        if isinstance(field, UUIDField): return lambda x: provider.uuid()
-
-        if isinstance(field, BooleanField): return lambda x: faker.boolean()
-        if isinstance(field, NullBooleanField): return lambda x: faker.null_boolean()
-        if isinstance(field, PositiveSmallIntegerField): return lambda x: provider.rand_small_int(pos=True)
-        if isinstance(field, SmallIntegerField): return lambda x: provider.rand_small_int()
-        if isinstance(field, BigIntegerField): return lambda x: provider.rand_big_int()
-        if isinstance(field, PositiveIntegerField): return lambda x: provider.rand_small_int(pos=True)
-        if isinstance(field, IntegerField): return lambda x: provider.rand_small_int()
-        if isinstance(field, FloatField): return lambda x: provider.rand_float()
-        if isinstance(field, DecimalField): return lambda x: random.random()
-
-        if isinstance(field, URLField): return lambda x: faker.uri()
-        if isinstance(field, SlugField): return lambda x: faker.slug()
-        if isinstance(field, IPAddressField) or isinstance(field, GenericIPAddressField):
-            protocol = random.choice(['ipv4', 'ipv6'])
-            return lambda x: getattr(faker, protocol)()
-        if isinstance(field, EmailField): return lambda x: faker.email()
-        if isinstance(field, CommaSeparatedIntegerField) or \
-                (isinstance(field, CharField) and (validate_comma_separated_integer_list in field.validators)):
-            return lambda x: provider.comma_sep_ints()
-
-        if isinstance(field, BinaryField): return lambda x: provider.binary()
-        if isinstance(field, ImageField): return lambda x: provider.file_name()
-        if isinstance(field, FilePathField): return lambda x: provider.file_name()
-        if isinstance(field, FileField): return lambda x: provider.file_name()
-
-        if isinstance(field, CharField):
-            return lambda x: faker.text(field.max_length) if field.max_length >= 5 else faker.word()
-        if isinstance(field, TextField): return lambda x: faker.text()
-
-        if isinstance(field, DateTimeField):
-            # format with timezone if it is active
-            return lambda x: _timezone_format(faker.date_time())
-        if isinstance(field, DateField): return lambda x: faker.date()
-        if isinstance(field, TimeField): return lambda x: faker.time()
-        if isinstance(field, ArrayField):
-            return lambda x: [self.guess_format(field.base_field)(1)]
-
-        if isinstance(field, JSONField):
-            def json_generator(_, data_columns: list = None, num_rows: int = 10, indent: int = None) -> str:
-                return faker.json(data_columns=data_columns, num_rows=num_rows, indent=indent)
-            return json_generator
+            values = [choice[0] for choice in collected_choices]
+            columns = self.columns
+            return BatchFormatter(lambda x: random.choice(values), lambda n: columns.choices(n, values))
+
+        format = self.resolve(type(field))
+        if format is not None:
+            return format(self, field)
 
         # TODO: This should be fine, but I can't find any models that I can use
         # in a simple test case.
         if hasattr(field, '_default_hint'): return lambda x: field._default_hint[1]
         raise AttributeError(field)
+
+
+def _provider_format(method, column_method=None, **kwargs):
+    """
+    The format of fields generated by the Provider method named $method, and
+    by the ColumnProvider method named $column_method in batches
+    """
+    def format(guesser, field):
+        provider_method = getattr(guesser.provider, method)
+        row = lambda x: provider_method(**kwargs)
+        if column_method is None:
+            return row
+        column = getattr(guesser.columns, column_method)
+        return BatchFormatter(row, lambda n: column(n, **kwargs))
+
+    return format
+
+
+def _ip_address_format(guesser, field):
+    protocol = random.choice(['ipv4', 'ipv6'])
+    faker = guesser.faker
+    return lambda x: getattr(faker, protocol)()
+
+
+def _char_format(guesser, field):
+    if validate_comma_separated_integer_list in field.validators:
+        return _provider_format('comma_sep_ints')(guesser, field)
+    faker = guesser.faker
+    return lambda x: faker.text(field.max_length) if field.max_length >= 5 else faker.word()
+
+
+def _decimal_format(guesser, field):
+    return BatchFormatter(lambda x: random.random(), guesser.columns.rand_float)
+
+
+def _array_format(guesser, field):
+    return lambda x: [guesser.guess_format(field.base_field)(1)]
+
+
+def _json_format(guesser, field):
+    faker = guesser.faker
+
+    def json_generator(_, data_columns: list = None, num_rows: int = 10, indent: int = None) -> str:
+        return faker.json(data_columns=data_columns, num_rows=num_rows, indent=indent)
+    return json_generator
+
+
+for field_class, format in (
+    ('DurationField', _provider_format('duration', 'duration')),
+    ('UUIDField', _provider_format('uuid')),
+    ('BooleanField', _faker_format('boolean', 'boolean')),
+    ('NullBooleanField', _faker_format('null_boolean', 'null_boolean')),
+    ('PositiveSmallIntegerField', _provider_format('rand_small_int', 'rand_small_int', pos=True)),
+    ('SmallIntegerField', _provider_format('rand_small_int', 'rand_small_int')),
+    ('BigIntegerField', _provider_format('rand_big_int', 'rand_big_int')),
+    ('PositiveIntegerField', _provider_format('rand_small_int', 'rand_small_int', pos=True)),
+    ('IntegerField', _provider_format('rand_small_int', 'rand_small_int')),
+    ('FloatField', _provider_format('rand_float', 'rand_float')),
+    ('DecimalField', _decimal_format),
+    ('URLField', _faker_format('uri')),
+    ('SlugField', _faker_format('slug')),
+    ('IPAddressField', _ip_address_format),
+    ('GenericIPAddressField', _ip_address_format),
+    ('EmailField', _faker_format('email')),
+    ('CommaSeparatedIntegerField', _provider_format('comma_sep_ints')),
+    ('BinaryField', _provider_format('binary')),
+    ('FileField', _provider_format('file_name')),
+    ('FilePathField', _provider_format('file_name')),
+    ('CharField', _char_format),
+    ('TextField', _faker_format('text')),
+    ('DateTimeField', _date_time_format),
+    ('DateField', _faker_format('date', 'date')),
+    ('TimeField', _faker_format('time', 'time')),
+    ('JSONField', _json_format),
+):
+    # Some fields only exist in some Django versions
+    if hasattr(models, field_class):
+        FieldTypeGuesser.register(getattr(models, field_class), format)
+
+# Registered by path, so that django.contrib.postgres and psycopg2 are only
+# imported by projects using these fields
+FieldTypeGuesser.register('django.contrib.postgres.fields.array.ArrayField', _array_format)
+FieldTypeGuesser.register('django.contrib.postgres.fields.jsonb.JSONField', _json_format)
@@ -1,11 +1,61 @@
 import argparse
+import random
+import time
 from django.core.management.base import AppCommand
 from django_seed import Seed
 from django_seed.exceptions import SeederCommandError
+from django_seed.exporters import EXPORTERS, open_exporter
+from django_seed.primary_keys import PrimaryKeyList
+from django_seed.snapshots import SnapshotCache
+from django_seed.stats import SeedStats
 from toposort import toposort_flatten
 from collections import defaultdict
 
 
+class ProgressReporter(object):
+    """
+    Report the number of seeded rows, the throughput and the ETA every
+    $interval seconds instead of a line per inserted row
+    """
+
+    def __init__(self, stdout, total, interval=1.0, clock=time.monotonic):
+        self.stdout = stdout
+        self.total = total
+        self.interval = interval
+        self.clock = clock
+        self.started = self.last_report = clock()
+        self.count = 0
+        self.models = {}
+
+    def update(self, model, count):
+        self.count += count
+        self.models[model] = self.models.get(model, 0) + count
+
+        now = self.clock()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.stdout.write(self.progress(now))
+
+    def rate(self, now):
+        elapsed = now - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def progress(self, now):
+        rate = self.rate(now)
+        remaining = max(self.total - self.count, 0)
+        eta = f'{remaining / rate:.0f}s' if rate else 'unknown'
+        return f'Seeded {self.count}/{self.total} rows, {rate:.0f} rows/s, ETA {eta}'
+
+    def finish(self):
+        now = self.clock()
+        for model, count in self.models.items():
+            self.stdout.write(f'Seeded {count} {model.__name__}s')
+        self.stdout.write(
+            f'Seeded {self.count} rows in {now - self.started:.2f}s '
+            f'({self.rate(now):.0f} rows/s)'
+        )
+
+
 class Command(AppCommand):
     help = 'Seed your Django database with fake data.'
 
@@ -17,12 +67,130 @@ class Command(AppCommand):
                             default=10, type=int, required=False,
                             help=help_text, dest='number')
 
+        help_text = ('Seed each model up to this number of rows, only the rows '
+                     'missing from the database are inserted. Large tables are '
+                     'counted from the estimates of the database.')
+        parser.add_argument('--target-count', action='store', default=None,
+                            type=int, required=False, help=help_text,
+                            dest='target_count')
+
         help_text = ('Use this to specify the value a particular field should '
                      'have rather than seeding with Faker.')
         parser.add_argument('--seeder', action='append', nargs=2,
                             required=False, type=str, help=help_text,
                             metavar=('model.field', 'value'), dest='seeder')
 
+        help_text = ('Insert rows in batches of this size with bulk_create '
+                     'instead of one at a time.')
+        parser.add_argument('--batch-size', action='store', default=None,
+                            type=int, required=False, help=help_text,
+                            dest='batch_size')
+
+        help_text = ('Seed models that do not depend on each other in '
+                     'parallel on this many worker processes.')
+        parser.add_argument('--workers', action='store', default=None,
+                            type=int, required=False, help=help_text,
+                            dest='workers')
+
+        help_text = ('Seed this database, can be repeated to split the rows '
+                     'between several databases seeded concurrently. An '
+                     'optional weight sets the share of the rows of a database, '
+                     'e.g. --database default:3 --database replica:1.')
+        parser.add_argument('--database', action='append', default=None,
+                            type=str, required=False, help=help_text,
+                            metavar='ALIAS[:WEIGHT]', dest='database')
+
+        help_text = ('Generate the next chunks of rows on this many threads '
+                     'while the current chunk is inserted.')
+        parser.add_argument('--pipeline', action='store', default=None,
+                            type=int, required=False, help=help_text,
+                            dest='pipeline')
+
+        help_text = ('Pick the related rows of models that are not seeded, or '
+                     'not seeded yet, among the rows already in the database.')
+        parser.add_argument('--existing', action='store_true', default=False,
+                            required=False, help=help_text, dest='existing')
+
+        help_text = ('Seconds between two progress reports (default 1). '
+                     'Use 0 to report after every chunk of rows.')
+        parser.add_argument('--progress-interval', action='store', default=1.0,
+                            type=float, required=False, help=help_text,
+                            dest='progress_interval')
+
+        help_text = ('Write the primary keys of the seeded rows to this file, '
+                     'one "app_label.Model,pk" line per row.')
+        parser.add_argument('--pk-output', action='store', default=None,
+                            type=str, required=False, help=help_text,
+                            metavar='FILE', dest='pk_output')
+
+        help_text = ('Print the time spent in each field formatter and in the '
+                     'database, and the inserted, skipped and retried rows of '
+                     'each model.')
+        parser.add_argument('--stats', action='store_true', default=False,
+                            required=False, help=help_text, dest='stats')
+
+        help_text = ('Seed Faker and the random module with this value so that '
+                     'the same rows are generated every time.')
+        parser.add_argument('--faker-seed', action='store', default=None,
+                            type=int, required=False, help=help_text,
+                            dest='faker_seed')
+
+        help_text = ('Keep a snapshot of the seeded tables in this directory, '
+                     'and restore it instead of seeding when the models, the '
+                     'number of rows and the faker seed are the same.')
+        parser.add_argument('--cache-dir', action='store', default=None,
+                            type=str, required=False, help=help_text,
+                            metavar='DIR', dest='cache_dir')
+
+        help_text = ('Write the generated rows to this file instead of the '
+                     'database: a Django fixture (.json), JSON lines (.jsonl) '
+                     'or a directory of CSV files.')
+        parser.add_argument('--export', action='store', default=None,
+                            type=str, required=False, help=help_text,
+                            metavar='PATH', dest='export')
+
+        help_text = 'The format of --export, guessed from its extension by default.'
+        parser.add_argument('--export-format', action='store', default=None,
+                            choices=sorted(EXPORTERS), required=False,
+                            help=help_text, dest='export_format')
+
+    def handle(self, *app_labels, **options):
+        self.pk_output = None
+        if not options.get('pk_output'):
+            return super().handle(*app_labels, **options)
+
+        with open(options['pk_output'], 'w') as self.pk_output:
+            return super().handle(*app_labels, **options)
+
+    def write_pks(self, model, pks, verbosity):
+        """
+        Stream the primary keys of a chunk to the --pk-output file, and to
+        stdout with --verbosity 3
+        """
+        if self.pk_output is not None:
+            label = model._meta.label
+            self.pk_output.write(''.join(f'{label},{pk}\n' for pk in pks))
+
+        if verbosity >= 3:
+            for pk in pks:
+                self.stdout.write(f"Model {model.__name__} generated record with primary key {pk}")
+
+    def databases(self, options):
+        """
+        The weight of each --database alias, None when it was not given
+        """
+        if not options.get('database'):
+            return None
+
+        databases = {}
+        for database in options['database']:
+            alias, _, weight = database.partition(':')
+            try:
+                databases[alias] = int(weight) if weight else 1
+            except ValueError:
+                raise SeederCommandError(f'The weight of --database {database} must be an integer')
+        return databases
+
     def handle_app_config(self, app_config, **options):
         if app_config.models_module is None:
             raise SeederCommandError('You must provide an app to seed')
@@ -32,6 +200,18 @@ class Command(AppCommand):
         except ValueError:
             raise SeederCommandError('The value of --number must be an integer')
 
+        target = options.get('target_count') is not None
+        if target:
+            number = options['target_count']
+
+        # Checked before any order is queued on the shared seeder
+        databases = self.databases(options)
+        if databases is not None and len(databases) > 1:
+            if options.get('cache_dir'):
+                raise SeederCommandError('--cache-dir cannot be used with several databases')
+            if options.get('workers') and options['workers'] > 1:
+                raise SeederCommandError('--workers cannot be used with several databases')
+
         # Gather seeders
         seeders = defaultdict(dict)
 
@@ -45,19 +225,110 @@ class Command(AppCommand):
 
         # Seed
         seeder = Seed.seeder()
-        for model in self.sorted_models(app_config):
-            if model.__name__ in seeders:
-                seeder.add_entity(model, number, seeders[model.__name__])
+        if options.get('faker_seed') is not None:
+            random.seed(options['faker_seed'])
+            seeder.faker.seed_instance(options['faker_seed'])
+
+        models = self.sorted_models(app_config)
+        for model in models:
+            seeder.add_entity(model, number, seeders.get(model.__name__), target=target)
+
+        if target and not options.get('export') and (databases is None or len(databases) == 1):
+            seeder.resolve_targets(next(iter(databases)) if databases else seeder.get_connection())
+
+        for order in seeder.orders:
+            self.stdout.write('Seeding %i %ss' % (order['quantity'], order['klass'].__name__))
+
+        verbosity = options.get('verbosity', 1)
+        reporter = ProgressReporter(
+            self.stdout, sum(order['quantity'] for order in seeder.orders),
+            options.get('progress_interval', 1.0)
+        )
+        if not seeder.orders:
+            reporter.finish()
+            return
+
+        if options.get('export'):
+            with open_exporter(options['export'], options.get('export_format')) as exporter:
+                for chunk in seeder.iter_export(exporter):
+                    self.write_pks(chunk.model, chunk.pks, verbosity)
+                    reporter.update(chunk.model, chunk.count)
+            reporter.finish()
+            return
+
+        if databases is not None and len(databases) > 1:
+            results = seeder.execute(databases, batch_size=options.get('batch_size'),
+                                     stats=options.get('stats'), pipeline=options.get('pipeline'),
+                                     existing=options.get('existing'))
+            for alias, generated in results.items():
+                for model, pks in generated.items():
+                    self.write_pks(model, pks, verbosity)
+                    reporter.update(model, len(pks))
+                self.stdout.write(f'Seeded {sum(map(len, generated.values()))} rows in {alias}')
+            reporter.finish()
+            for alias, generated in results.items():
+                if generated.stats is not None:
+                    self.stdout.write(f'Stats of {alias}:')
+                    self.stdout.write(generated.stats.format())
+            return
+
+        using = next(iter(databases)) if databases else None
+        cache = key = None
+        if options.get('cache_dir'):
+            cache = SnapshotCache(options['cache_dir'])
+            key = cache.key(seeder.orders, options.get('faker_seed'), options.get('seeder'))
+            using = using or seeder.get_connection()
+            restored = cache.restore(key, using)
+            if restored is not None:
+                seeder.orders = []
+                self.stdout.write(f'Restored snapshot {key}')
+                for model, pks in restored.items():
+                    self.write_pks(model, pks, verbosity)
+                    reporter.update(model, len(pks))
+                reporter.finish()
+                return
+
+        stats = None
+        inserted_entities = {}
+        workers = options.get('workers')
+        if workers and workers > 1:
+            generated = seeder.execute(using=using, batch_size=options.get('batch_size'), workers=workers,
+                                       stats=options.get('stats'), pipeline=options.get('pipeline'),
+                                       existing=options.get('existing'))
+            stats = generated.stats
+            for model, pks in generated.items():
+                self.write_pks(model, pks, verbosity)
+                reporter.update(model, len(pks))
+            inserted_entities = generated
+        else:
+            if options.get('stats'):
+                stats = SeedStats()
+            chunks = seeder.iter_execute(using=using, batch_size=options.get('batch_size'), stats=stats,
+                                         pipeline=options.get('pipeline'),
+                                         existing=options.get('existing'))
+            for chunk in chunks:
+                self.write_pks(chunk.model, chunk.pks, verbosity)
+                reporter.update(chunk.model, chunk.count)
+                inserted_entities.setdefault(chunk.model, PrimaryKeyList()).extend(chunk.pks)
+
+        if cache is not None:
+            # The rows can only be found again by their PKs
+            if sum(map(len, inserted_entities.values())) == reporter.count:
+                cache.save(key, inserted_entities, using)
+                self.stdout.write(f'Saved snapshot {key}')
             else:
-                seeder.add_entity(model, number)
-            self.stdout.write('Seeding %i %ss' % (number, model.__name__))
+                self.stdout.write('Cannot save a snapshot, the database did not '
+                                  'return the primary keys of the inserted rows')
 
-        generated = seeder.execute()
-        for model, pks in generated.items():
-            for pk in pks:
-                self.stdout.write(f"Model {model.__name__} generated record with primary key {pk}")
+        reporter.finish()
+        if stats is not None:
+            self.stdout.write(stats.format())
 
-    def get_model_dependencies(self, models):
+    def get_model_dependencies(self, models, nullable=True):
+        """
+        :param nullable: Whether the nullable relations are dependencies, the
+        seeder can fill them once the related model is seeded
+        """
         dep_dict = {}
         dep_class_map = {}
 
@@ -73,7 +344,7 @@ class Command(AppCommand):
 
             for field in model._meta.get_fields():
                 if ((field.many_to_one is True or field.many_to_many is True or field.one_to_one is True) and
-                    field.concrete and field.blank is False):
+                    field.concrete and field.blank is False and (nullable or not field.null)):
 
                     related_model = field.related_model
                     related_model_type = '{}.{}'.format(
@@ -92,9 +363,19 @@ class Command(AppCommand):
         return (dep_dict, dep_class_map)
 
     def sorted_models(self, app_config):
-        dep_dict, dep_class_map = self.get_model_dependencies(app_config.get_models())
+        """
+        The models of the app, each after the models it depends on. Cycles
+        are broken on their nullable relations, filled once the related
+        models are seeded.
+        """
+        models = list(app_config.get_models())
+        dep_dict, dep_class_map = self.get_model_dependencies(models)
 
         try:
             return [dep_class_map[x] for x in toposort_flatten(dep_dict)]
-        except ValueError as ex:
-            raise SeederCommandError(str(ex))
+        except ValueError:
+            dep_dict, dep_class_map = self.get_model_dependencies(models, nullable=False)
+            try:
+                return [dep_class_map[x] for x in toposort_flatten(dep_dict)]
+            except ValueError as ex:
+                raise SeederCommandError(str(ex))
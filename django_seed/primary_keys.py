@@ -0,0 +1,266 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+import random
+import uuid
+
+from django.db.models import AutoField, IntegerField, Max, Min
+
+
+# Number of consecutive integers at the end of an array segment after which
+# they are moved into a range segment
+RUN_LENGTH = 16
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+# Maximum number of existing PKs indexed per model. Integer PKs spanning a
+# wider range are sampled by range bounds instead of streamed.
+EXISTING_PKS_LIMIT = 100000
+
+# Consecutive PKs read from each random bound when sampling a large table
+EXISTING_PKS_PAGE = 1000
+
+
+def is_int64(pk):
+    return isinstance(pk, int) and not isinstance(pk, bool) and INT64_MIN <= pk <= INT64_MAX
+
+
+class UUIDBuffer(object):
+    """
+    Packed storage for UUIDs, 16 bytes each
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def __len__(self):
+        return len(self.data) // 16
+
+    def __getitem__(self, index):
+        return uuid.UUID(bytes=bytes(self.data[index * 16:(index + 1) * 16]))
+
+    def __setitem__(self, index, value):
+        self.data[index * 16:(index + 1) * 16] = value.bytes
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, value):
+        self.data += value.bytes
+
+
+class PrimaryKeyList(object):
+    """
+    Compact list of the primary keys inserted for a model.
+
+    Contiguous runs of integers are stored as ranges, other integers in an
+    array('q'), UUIDs in a packed bytes buffer and anything else in a plain
+    list. Supports len(), indexing and random sampling like a list.
+
+    When $max_size is given, only a uniform random sample (reservoir) of at
+    most $max_size primary keys is kept.
+    """
+
+    def __init__(self, pks=(), max_size=None):
+        self.segments = []
+        self.offsets = []
+        self.length = 0
+        self.max_size = max_size
+        self.seen = 0
+        self.run = 0
+        self.extend(pks)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for segment in self.segments:
+            yield from segment
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("primary key index out of range")
+
+        position = bisect_right(self.offsets, index) - 1
+        return self.segments[position][index - self.offsets[position]]
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def sample(self):
+        """
+        A random primary key out of the stored ones
+        """
+        return self[random.randrange(self.length)]
+
+    def extend(self, pks):
+        for pk in pks:
+            self.append(pk)
+
+    def append(self, pk):
+        self.seen += 1
+
+        if self.max_size is not None and self.length >= self.max_size:
+            # Reservoir sampling, every primary key seen so far has the same
+            # chance of being kept
+            index = random.randrange(self.seen)
+            if index < self.max_size:
+                self.flatten()
+                self.segments[0][index] = pk
+            return
+
+        if is_int64(pk):
+            self.append_int(pk)
+        elif isinstance(pk, uuid.UUID):
+            self.append_to(UUIDBuffer, pk)
+        else:
+            self.append_to(list, pk)
+
+        self.length += 1
+
+    def append_int(self, pk):
+        last = self.segments[-1] if self.segments else None
+
+        if isinstance(last, range) and pk == last.stop:
+            self.segments[-1] = range(last.start, pk + 1)
+            return
+
+        if not isinstance(last, array):
+            self.run = 0
+            self.add_segment(array('q'))
+            last = self.segments[-1]
+
+        if last and pk == last[-1] + 1:
+            self.run += 1
+        else:
+            self.run = 1
+        last.append(pk)
+
+        if self.run == RUN_LENGTH:
+            del last[-RUN_LENGTH:]
+            offset = self.offsets[-1] + len(last)
+            if not last:
+                self.segments.pop()
+                self.offsets.pop()
+            self.segments.append(range(pk - RUN_LENGTH + 1, pk + 1))
+            self.offsets.append(offset)
+            self.run = 0
+
+    def append_to(self, segment_type, pk):
+        if not self.segments or not isinstance(self.segments[-1], segment_type):
+            self.add_segment(segment_type())
+        self.segments[-1].append(pk)
+
+    def add_segment(self, segment):
+        self.offsets.append(self.length)
+        self.segments.append(segment)
+
+    def flatten(self):
+        """
+        Merge the segments into a single mutable one, used once the reservoir
+        is full and primary keys get replaced at random positions
+        """
+        if len(self.segments) == 1 and not isinstance(self.segments[0], range):
+            return
+
+        pks = list(self)
+        if all(is_int64(pk) for pk in pks):
+            segment = array('q', pks)
+        elif all(isinstance(pk, uuid.UUID) for pk in pks):
+            segment = UUIDBuffer()
+            for pk in pks:
+                segment.append(pk)
+        else:
+            segment = pks
+
+        self.segments = [segment]
+        self.offsets = [0]
+
+
+class ExistingPrimaryKeys(object):
+    """
+    Index of the PKs already in the database $using, loaded once per model
+    the first time it is needed. The PKs of a table are streamed into a
+    PrimaryKeyList, a reservoir of at most $limit PKs. Tables with integer
+    PKs spanning more than $limit values are sampled instead: pages of
+    consecutive PKs are read from random bounds between the smallest and the
+    largest PK, in $limit / $page queries.
+    """
+
+    def __init__(self, using, limit=EXISTING_PKS_LIMIT, page=EXISTING_PKS_PAGE):
+        self.using = using
+        self.limit = limit
+        self.page = page
+        self.indexes = {}
+
+    def get(self, model):
+        """
+        :rtype: The PrimaryKeyList of the existing PKs of $model
+        """
+        if model not in self.indexes:
+            self.indexes[model] = self.load(model)
+        return self.indexes[model]
+
+    def load(self, model):
+        queryset = model._default_manager.db_manager(self.using).order_by()
+
+        pk = model._meta.pk
+        # AutoField only subclasses IntegerField from Django 3.0
+        if isinstance(pk.target_field if pk.is_relation else pk, (IntegerField, AutoField)):
+            bounds = queryset.aggregate(low=Min("pk"), high=Max("pk"))
+            if bounds["low"] is None:
+                return PrimaryKeyList()
+            if bounds["high"] - bounds["low"] >= self.limit:
+                return self.sample(queryset, bounds["low"], bounds["high"])
+
+        pks = PrimaryKeyList(max_size=self.limit)
+        pks.extend(queryset.values_list("pk", flat=True).iterator())
+        return pks
+
+    def sample(self, queryset, low, high):
+        """
+        Read pages of consecutive PKs from random bounds between $low and
+        $high. Rows following gaps in the PKs are more likely to be picked.
+        """
+        queryset = queryset.order_by("pk").values_list("pk", flat=True)
+        pks = PrimaryKeyList()
+        for _ in range(max(self.limit // self.page, 1)):
+            bound = random.randint(low, high)
+            pks.extend(queryset.filter(pk__gte=bound)[:self.page])
+        return pks
+
+
+class RelatedEntities(Mapping):
+    """
+    The inserted PKs of each model to pick related rows from, falling back
+    to the $existing PKs of the database for the models without inserted rows
+    """
+
+    def __init__(self, inserted_entities, existing):
+        self.inserted_entities = inserted_entities
+        self.existing = existing
+
+    def __getitem__(self, model):
+        pks = self.inserted_entities.get(model)
+        if pks:
+            return pks
+        return self.existing.get(model)
+
+    def __iter__(self):
+        return iter(self.inserted_entities)
+
+    def __len__(self):
+        return len(self.inserted_entities)
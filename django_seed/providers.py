@@ -1,16 +1,69 @@
 
-from datetime import timedelta
+from datetime import datetime, time as datetime_time, timedelta
+from importlib.util import find_spec
 import random
 import time
 import uuid
 import sys
 
 
+# NumPy is optional, whole columns are generated with it when available. It
+# is only imported once the first column is generated.
+HAS_NUMPY = find_spec('numpy') is not None
+
+
 file_extensions = ("flac", "mp3", "wav", "bmp", "gif", "jpeg", "jpg", "png",
                    "tiff", "css", "csv", "html", "js", "json", "txt", "mp4",
                    "avi", "mov", "webm")
 
 
+class LazyFaker(object):
+    """
+    Stands in for Faker($locale). Faker and the providers of the locale are
+    only loaded the first time the faker is used, and it is then seeded with
+    $seed unless seed_instance() was called in the meantime.
+    """
+
+    def __init__(self, locale=None, seed=None):
+        self._locale = locale
+        self._seed = seed
+        self._faker = None
+
+    @property
+    def loaded(self):
+        return self._faker is not None
+
+    def load(self):
+        if self._faker is None:
+            from faker import Faker
+            faker = Faker(self._locale)
+            if self._seed is not None:
+                faker.seed_instance(self._seed)
+            self._faker = faker
+        return self._faker
+
+    def seed_instance(self, seed=None):
+        if self._faker is None:
+            self._seed = seed
+        else:
+            self._faker.seed_instance(seed)
+        return self
+
+    def __getattr__(self, name):
+        # Only called for the attributes of the Faker, guard against
+        # recursing when the instance is not initialized, e.g. while copying
+        if name in ('_locale', '_seed', '_faker'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    # Special methods are looked up on the type, not through __getattr__
+    def __getitem__(self, locale):
+        return self.load()[locale]
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(dir(self.load())))
+
+
 class Provider(object):
     """
     Provider class contains methods for random data that are not
@@ -54,3 +107,77 @@ class Provider(object):
     def binary(self):
         word = self.faker.text(512)
         return str.encode(str(word))
+
+
+class ColumnProvider(object):
+    """
+    ColumnProvider generates a whole column of $n random values at once,
+    with NumPy when it is installed. The values have the same ranges as the
+    per-row Provider and Faker methods.
+    """
+
+    def __init__(self, faker, use_numpy=True):
+        self.faker = faker
+        self.use_numpy = use_numpy and HAS_NUMPY
+
+    def rng(self):
+        import numpy
+
+        # Seeded from the random module so that random.seed() also makes the
+        # NumPy columns repeatable
+        return numpy.random.default_rng(random.getrandbits(64))
+
+    def integers(self, n, low, high):
+        if self.use_numpy:
+            return self.rng().integers(low, high, size=n, endpoint=True).tolist()
+        if high - low < sys.maxsize:
+            return random.choices(range(low, high + 1), k=n)
+        return [random.randint(low, high) for _ in range(n)]
+
+    def rand_small_int(self, n, pos=False):
+        return self.integers(n, 0 if pos else -32768, 32767)
+
+    def rand_big_int(self, n):
+        return self.integers(n, -sys.maxsize, sys.maxsize)
+
+    def rand_float(self, n):
+        if self.use_numpy:
+            return self.rng().random(n).tolist()
+        return [random.random() for _ in range(n)]
+
+    def choices(self, n, values):
+        return random.choices(values, k=n)
+
+    def boolean(self, n):
+        return self.choices(n, (True, False))
+
+    def null_boolean(self, n):
+        return self.choices(n, (None, True, False))
+
+    def seconds(self, n):
+        return self.integers(n, 0, int(time.time()))
+
+    def duration(self, n):
+        if self.use_numpy:
+            seconds = self.rng().integers(0, int(time.time()), size=n, endpoint=True)
+            return seconds.astype('timedelta64[s]').astype('timedelta64[us]').tolist()
+        return [timedelta(seconds=seconds) for seconds in self.seconds(n)]
+
+    def date_time(self, n):
+        """
+        Naive datetimes between the epoch and now, like faker.date_time()
+        """
+        if self.use_numpy:
+            seconds = self.rng().integers(0, int(time.time()), size=n, endpoint=True)
+            return seconds.astype('datetime64[s]').astype('datetime64[us]').tolist()
+        epoch = datetime(1970, 1, 1)
+        return [epoch + timedelta(seconds=seconds) for seconds in self.seconds(n)]
+
+    def date(self, n):
+        return [value.date() for value in self.date_time(n)]
+
+    def time(self, n):
+        return [
+            datetime_time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+            for seconds in self.integers(n, 0, 86399)
+        ]
@@ -1,28 +1,437 @@
-import random, logging
+import random, logging, multiprocessing, queue, threading, time, uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-from django.db.models import ForeignKey, ManyToManyField, OneToOneField
+from django.core.management.color import no_style
+from django.db.models import (
+    AutoField, BigAutoField, BinaryField, ForeignKey, IntegerField, ManyToManyField, Max, Model,
+    OneToOneField, UUIDField
+)
+from django.db.models.signals import class_prepared
+from django.core.signals import setting_changed
 
 from django_seed.exceptions import SeederException
-from django_seed.guessers import NameGuesser, FieldTypeGuesser
+from django_seed.exporters import open_exporter
+from django_seed.guessers import (
+    BatchFormatter, NameGuesser, FieldTypeGuesser, PooledFormatter, format_registered
+)
+from django_seed.primary_keys import ExistingPrimaryKeys, PrimaryKeyList, RelatedEntities
+from django_seed.snapshots import chunked
+from django_seed.stats import SeedResult, SeedStats
 from django.db.utils import IntegrityError
-from django.db import transaction
+from django.db import connections, router, transaction
+
+try:
+    from django.db.models import SmallAutoField
+except ImportError:
+    # Django < 3.0
+    SmallAutoField = None
+
+
+# The primary keys numbered by the database, allocated by the seeder when it
+# inserts the rows itself
+AUTO_FIELDS = tuple(field for field in (AutoField, BigAutoField, SmallAutoField) if field)
+
+# Rows per executemany() call of the raw engine when no batch size is given
+RAW_BATCH_SIZE = 1000
+
+# Rows per transaction when rows are inserted one at a time
+ROW_CHUNK_SIZE = 1000
+
+# Chunks of rows generated ahead by a RowPipeline, waiting to be inserted
+PIPELINE_DEPTH = 2
+
+# Tables estimated to hold more rows than this are not counted exactly when
+# seeding up to a target number of rows
+EXACT_COUNT_LIMIT = 1000000
+
+# State of the level being seeded by Seeder.execute_levels, inherited by the
+# forked worker processes
+FORK_STATE = {}
+
+
+def execute_forked_order(index):
+    """
+    Run a single order of the current level in a forked worker process
+    :rtype: A tuple of the model, the PrimaryKeyList of inserted PKs, the
+    SeedStats of the order, None when not recorded, and the PKs handed out
+    by each UnusedPKPool of the seeder
+    """
+    seeder = FORK_STATE["seeder"]
+    order = FORK_STATE["level"][index]
+    for pool in seeder.relation_pools.values():
+        pool.taken = []
+
+    # Every worker starts with the random state of the parent, reseed them so
+    # that they do not all generate the same values
+    random.seed()
+    seeder.faker.seed_instance(random.getrandbits(64))
+
+    seeder.orders = [order]
+    pks = PrimaryKeyList()
+    stats = SeedStats() if FORK_STATE["stats"] is not None else None
+    chunks = seeder.execute_orders(
+        FORK_STATE["using"],
+        FORK_STATE["inserted_entities"],
+        FORK_STATE["batch_size"],
+        reservoir_size=FORK_STATE["reservoir_size"],
+        stats=stats,
+        pipeline=FORK_STATE["pipeline"],
+        existing=FORK_STATE["existing"],
+        # The parent process fills the deferred relations once every level
+        # was seeded
+        deferred=[],
+    )
+    for chunk in chunks:
+        pks.extend(chunk.pks)
+
+    connections.close_all()
+    taken = {field: pool.taken for field, pool in seeder.relation_pools.items() if pool.taken}
+    return order["klass"], pks, stats, taken
+
+
+# Number of running orders that disabled auto_now/auto_now_add per field,
+# with the original values to restore when the last one finishes
+AUTO_ADD_LOCK = threading.Lock()
+AUTO_ADD_DISABLED = {}
+
+
+@contextmanager
+def auto_add_disabled(model):
+    """
+    Turn off auto_now and auto_now_add on the fields of $model, so the
+    generated values are kept, and restore them afterwards
+    """
+    fields = [
+        field for field in model._meta.fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+        or field in AUTO_ADD_DISABLED
+    ]
+
+    with AUTO_ADD_LOCK:
+        for field in fields:
+            if field in AUTO_ADD_DISABLED:
+                count, auto_now, auto_now_add = AUTO_ADD_DISABLED[field]
+                AUTO_ADD_DISABLED[field] = (count + 1, auto_now, auto_now_add)
+            else:
+                AUTO_ADD_DISABLED[field] = (1, field.auto_now, field.auto_now_add)
+                field.auto_now = False
+                field.auto_now_add = False
+
+    try:
+        yield
+    finally:
+        with AUTO_ADD_LOCK:
+            for field in fields:
+                count, auto_now, auto_now_add = AUTO_ADD_DISABLED[field]
+                if count == 1:
+                    del AUTO_ADD_DISABLED[field]
+                    field.auto_now = auto_now
+                    field.auto_now_add = auto_now_add
+                else:
+                    AUTO_ADD_DISABLED[field] = (count - 1, auto_now, auto_now_add)
+
+
+# Formatters guessed by NameGuesser and FieldTypeGuesser, by (model, faker),
+# shared by every order of the model. Emptied when the app registry changes
+# or a format is registered.
+GUESSED_FORMATTERS = {}
+
+
+def clear_guessed_formatters(**kwargs):
+    if kwargs.get("setting", "INSTALLED_APPS") == "INSTALLED_APPS":
+        GUESSED_FORMATTERS.clear()
+
+
+class_prepared.connect(clear_guessed_formatters)
+setting_changed.connect(clear_guessed_formatters)
+format_registered.connect(clear_guessed_formatters)
+
+
+class GuessedFormatters(object):
+    """
+    The guessed formatter of each field of a model, guessed the first time
+    a field is not given a custom formatter
+    """
+
+    def __init__(self, faker):
+        self.faker = faker
+        self.formatters = {}
+        self.name_guesser = None
+        self.field_type_guesser = None
+
+    def get(self, field):
+        if field.name not in self.formatters:
+            self.formatters[field.name] = self.guess(field)
+        return self.formatters[field.name]
+
+    def guess(self, field):
+        if self.name_guesser is None:
+            self.name_guesser = NameGuesser(self.faker)
+            self.field_type_guesser = FieldTypeGuesser(self.faker)
+
+        if not field.choices:
+            formatter = self.name_guesser.guess_format(field.name)
+            if formatter:
+                return formatter
+
+        return self.field_type_guesser.guess_format(field)
+
+
+def split_quantity(number, weights):
+    """
+    Split $number rows between databases in proportion to their weights,
+    giving the rows left over by the rounding to the largest remainders
+    :param weights: A dict of the weight of each database alias
+    :rtype: A dict of the number of rows of each alias
+    """
+    total = sum(weights.values())
+    shares = {alias: number * weight / total for alias, weight in weights.items()}
+    quantities = {alias: int(share) for alias, share in shares.items()}
+
+    left = number - sum(quantities.values())
+    for alias in sorted(shares, key=lambda alias: shares[alias] - quantities[alias], reverse=True)[:left]:
+        quantities[alias] += 1
+    return quantities
+
+
+def bulk_insert_returns_pks(connection):
+    """
+    Whether bulk_create sets the primary keys of the inserted instances on
+    $connection. The feature was named can_return_ids_from_bulk_insert
+    before Django 3.0.
+    """
+    features = connection.features
+    if hasattr(features, "can_return_rows_from_bulk_insert"):
+        return features.can_return_rows_from_bulk_insert
+    return features.can_return_ids_from_bulk_insert
+
+
+def estimate_rows(model, using):
+    """
+    The number of rows of the table of $model according to the statistics
+    of the database, None when the backend has none or the table was never
+    analyzed
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)"
+        params = [connection.ops.quote_name(table)]
+    elif connection.vendor == "mysql":
+        sql = ("SELECT table_rows FROM information_schema.tables "
+               "WHERE table_schema = DATABASE() AND table_name = %s")
+        params = [table]
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+
+    # PostgreSQL reports -1 for the tables that were never analyzed
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def count_rows(model, using, exact_limit=EXACT_COUNT_LIMIT):
+    """
+    The number of rows of $model, from the estimate of the database when it
+    is above $exact_limit rows and counted otherwise
+    """
+    estimate = estimate_rows(model, using)
+    if estimate is not None and estimate > exact_limit:
+        return estimate
+    return model._default_manager.db_manager(using).count()
+
+
+def placeholder_value(field):
+    """
+    A value of the type of the column of the relation $field, inserted in
+    NOT NULL columns until the related row is known. The database checks the
+    relation when the transaction commits, once the value was replaced.
+    """
+    target = field.target_field
+    if isinstance(target, UUIDField):
+        return uuid.UUID(int=0)
+    # AutoField only subclasses IntegerField from Django 3.0
+    if isinstance(target, (IntegerField,) + AUTO_FIELDS):
+        return 0
+    return ""
+
+
+def constant(value):
+    def func(inserted):
+        return value
+
+    return func
+
+
+# One field of a compiled ModelSeeder plan: the key of the field in the row
+# data, the formatter, the length strings are truncated to and the function
+# converting values for the database
+FieldPlan = namedtuple("FieldPlan", ["attname", "generator", "max_length", "converter"])
+
+
+# A chunk of rows committed by Seeder.iter_execute. `pks` is empty when the
+# database does not return primary keys from bulk inserts, `count` is always
+# the number of inserted rows. `retried` is the number of rows regenerated
+# after an IntegrityError and `failed` the number of rows still missing once
+# the retries were spent.
+SeedChunk = namedtuple(
+    "SeedChunk", ["model", "pks", "count", "elapsed", "retried", "failed"]
+)
+
+
+class UnusedPKPool(object):
+    """
+    Hands out every primary key of a related model at most once, for
+    OneToOneFields. Primary keys inserted after the pool was created are
+    picked up the next time the pool is used.
+    """
+
+    def __init__(self):
+        self.source = None
+        self.absorbed = 0
+        self.unused = []
+        # The keys handed out, only recorded by worker processes
+        self.taken = None
+
+    def refresh(self, pks):
+        if pks is not self.source:
+            # A new execute() run, keys from the previous run are not
+            # candidates anymore
+            self.clear()
+            self.source = pks
+
+        if len(pks) > self.absorbed:
+            self.unused.extend(pks[self.absorbed:])
+            random.shuffle(self.unused)
+            self.absorbed = len(pks)
+
+    def available(self, pks):
+        self.refresh(pks)
+        return len(self.unused)
+
+    def take(self, pks):
+        self.refresh(pks)
+        if self.unused:
+            pk = self.unused.pop()
+            if self.taken is not None:
+                self.taken.append(pk)
+            return pk
+
+    def clear(self):
+        """
+        Forget the keys of the last run, so that they are not kept in memory
+        until the next one
+        """
+        self.source = None
+        self.absorbed = 0
+        self.unused = []
+
+    def discard(self, pks, taken):
+        """
+        Drop the keys $taken from the pool, e.g. handed out by a worker
+        process
+        """
+        self.refresh(pks)
+        taken = set(taken)
+        self.unused = [pk for pk in self.unused if pk not in taken]
+
+
+class RowPipeline(object):
+    """
+    Generates the chunks of rows of an order on $threads background threads
+    while the calling thread inserts the previous chunks. At most $depth
+    generated chunks wait in the queue, the generating threads block until
+    they are taken. Only the calling thread uses the database.
+    """
+
+    def __init__(self, entity, inserted_entities, sizes, threads=1, depth=PIPELINE_DEPTH):
+        self.entity = entity
+        self.inserted_entities = inserted_entities
+        self.sizes = iter(sizes)
+        self.count = len(sizes)
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.threads = [
+            threading.Thread(target=self.generate, daemon=True)
+            for _ in range(min(threads, self.count))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def next_size(self):
+        with self.lock:
+            return next(self.sizes, None)
+
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def generate(self):
+        size = self.next_size()
+        while size is not None and not self.stopped.is_set():
+            try:
+                item = (self.entity.generate_rows(self.inserted_entities, size), None)
+            except Exception as err:
+                self.put((None, err))
+                return
+            if not self.put(item):
+                return
+            size = self.next_size()
+
+    def __iter__(self):
+        try:
+            for _ in range(self.count):
+                rows, error = self.queue.get()
+                if error is not None:
+                    raise error
+                yield rows
+        finally:
+            self.close()
+
+    def close(self):
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join()
 
 
 class ModelSeeder(object):
-    def __init__(self, model):
+    def __init__(self, model, relation_pools=None):
         """
         :param model: Generator
+        :param relation_pools: optional dict of UnusedPKPool by OneToOneField,
+        shared by every order of a Seeder
         """
         self.model = model
         self.field_formatters = {}
         self.many_relations = {}
+        self.one_relations = {}
+        self.relation_pools = {} if relation_pools is None else relation_pools
+        self.fetched_relations = []
+        self.relation_fields = []
+        self.self_relations = []
+        self.deferred_relations = []
+        self.deferred_pks = PrimaryKeyList()
+        self.raw_plans = {}
+        self.plan = None
 
     @staticmethod
     def build_relation(field, related_model):
         def func(inserted):
             if related_model in inserted and inserted[related_model]:
-                pk = random.choice(inserted[related_model])
-                return related_model.objects.get(pk=pk)
+                return random.choice(inserted[related_model])
             elif not field.null:
                 message = "Field {} cannot be null".format(field)
                 raise SeederException(message)
@@ -30,14 +439,12 @@ class ModelSeeder(object):
         return func
 
     @staticmethod
-    def build_one_relation(field, related_model, existing):
+    def build_one_relation(field, related_model, pool):
         def func(inserted):
             if related_model in inserted and inserted[related_model]:
-                unused = list(set(inserted[related_model]) - existing)
-                if unused:
-                    pk = random.choice(unused)
-                    existing.add(pk)
-                    return related_model.objects.get(pk=pk)
+                pk = pool.take(inserted[related_model])
+                if pk is not None:
+                    return pk
 
             if not field.null:
                 message = "Field {} cannot be null".format(field)
@@ -45,18 +452,37 @@ class ModelSeeder(object):
 
         return func
 
+    @staticmethod
+    def relation_key(field):
+        """
+        Relations that point at the primary key of the related model are
+        filled in through the attname (e.g. `game_id`) so that no instance has
+        to be fetched. Relations to another unique field (`to_field`) still
+        need the related instance.
+        """
+        if field.target_field.primary_key:
+            return field.attname
+        return field.name
+
+    @staticmethod
+    def fetch_relation(field, func):
+        def fetch(inserted):
+            pk = func(inserted)
+            if pk is not None:
+                return field.related_model.objects.get(pk=pk)
+
+        return fetch
+
     @staticmethod
     def build_many_relation(field, related_model):
         def func(inserted):
             if related_model in inserted and inserted[related_model]:
                 max_relations = min(10, round(len(inserted[related_model]) / 5) + 1)
 
-                return_list = []
-                for _ in range(random.randint(1, max_relations)):
-                    choice = random.choice(inserted[related_model])
-                    return_list.append(related_model.objects.get(pk=choice))
-
-                return return_list
+                return [
+                    random.choice(inserted[related_model])
+                    for _ in range(random.randint(1, max_relations))
+                ]
             elif not field.blank:
                 message = "Field {} cannot be null".format(field)
                 raise SeederException(message)
@@ -71,20 +497,48 @@ class ModelSeeder(object):
 
         return func
 
-    def guess_field_formatters(self, faker, formatters=None):
+    def is_unique(self, field):
+        opts = self.model._meta
+        if field.unique:
+            return True
+        if any(field.name in fields for fields in opts.unique_together):
+            return True
+        constraints = getattr(opts, "total_unique_constraints", [])
+        return any(field.name in constraint.fields for constraint in constraints)
+
+    def pool_formatter(self, field, formatter, pool_sizes):
+        """
+        Wrap a guessed formatter in a PooledFormatter when a pool size is set
+        for the field. Formatters that already generate whole columns, UUIDs
+        and fields with unique constraints are never pooled.
+        """
+        pool_size = pool_sizes.get(field.name) if pool_sizes else None
+        if not pool_size or isinstance(formatter, BatchFormatter):
+            return formatter
+        if isinstance(field, UUIDField) or self.is_unique(field):
+            return formatter
+        return PooledFormatter(formatter, pool_size)
+
+    def guess_field_formatters(self, faker, formatters=None, pool_sizes=None):
         """
         Gets the formatter methods for each field using the guessers
-        or related object fields
+        or related object fields. The guessed formatters are cached per model
+        and faker, custom formatters replace them without guessing again.
         :param faker: Faker factory object
         :param formatters: this is 'customFieldFormatters' - optional dict with field as key and
         callable as value
         :type formatters: dict or None
+        :param pool_sizes: optional dict with field name as key and the size of
+        the pool of pre-generated values to sample from as value
+        :type pool_sizes: dict or None
         """
         if not formatters:
             formatters = {}
 
-        name_guesser = NameGuesser(faker)
-        field_type_guesser = FieldTypeGuesser(faker)
+        key = (self.model, faker)
+        if key not in GUESSED_FORMATTERS:
+            GUESSED_FORMATTERS[key] = GuessedFormatters(faker)
+        guessed = GUESSED_FORMATTERS[key]
 
         for field in self.model._meta.fields:
 
@@ -96,33 +550,35 @@ class ModelSeeder(object):
             # If user provides dict with data in 'seeder.add_entity(Model, num, data)', no reason to guess format.
             # Also user can provide field which is not covered in FieldTypeGuesser and 'raise AttributeError(field)'
             # will not be raised.
-            if field_name in formatters:
+            if field_name in formatters or field.attname in formatters:
                 continue
 
             if field.get_default():
                 formatters[field_name] = field.get_default()
                 continue
 
-            if isinstance(field, OneToOneField):
-                existing = set()
-                formatters[field_name] = self.build_one_relation(
-                    field, field.related_model, existing
-                )
-                continue
-
             if isinstance(field, ForeignKey):
-                formatters[field_name] = self.build_relation(field, field.related_model)
-                continue
+                if isinstance(field, OneToOneField):
+                    pool = self.relation_pools.setdefault(field, UnusedPKPool())
+                    self.one_relations[field] = pool
+                    formatter = self.build_one_relation(
+                        field, field.related_model, pool
+                    )
+                else:
+                    formatter = self.build_relation(field, field.related_model)
 
-            if not field.choices:
-                formatter = name_guesser.guess_format(field_name)
-                if formatter:
-                    formatters[field_name] = formatter
-                    continue
+                key = self.relation_key(field)
+                if key != field.attname:
+                    formatter = self.fetch_relation(field, formatter)
+                    self.fetched_relations.append(field)
+                elif not isinstance(field, OneToOneField):
+                    self.relation_fields.append(field)
+                formatters[key] = formatter
+                continue
 
-            formatter = field_type_guesser.guess_format(field)
+            formatter = guessed.get(field)
             if formatter:
-                formatters[field_name] = formatter
+                formatters[field_name] = self.pool_formatter(field, formatter, pool_sizes)
                 continue
 
         for field in self.model._meta.many_to_many:
@@ -132,60 +588,520 @@ class ModelSeeder(object):
 
         return formatters
 
+    def defer_relations(self, later_models, can_defer=True):
+        """
+        First phase of the seeding of self-referential and cyclic relations:
+        the relations to the model itself, and the nullable relations to
+        $later_models, are left empty when the rows are generated and filled
+        once the related rows exist. NOT NULL relations to the model itself
+        are only deferred when $can_defer, i.e. the database checks foreign
+        keys when the transaction commits.
+        """
+        self.self_relations = [
+            field for field in self.relation_fields
+            if field.related_model is self.model and (field.null or can_defer)
+        ]
+        self.deferred_relations = [
+            field for field in self.relation_fields
+            if field.related_model is not self.model and field.null
+            and field.related_model in later_models
+        ]
+        for field in self.self_relations + self.deferred_relations:
+            self.field_formatters[field.attname] = None if field.null else placeholder_value(field)
+
+    def pick_self_relations(self, pks, previous):
+        """
+        Point every row at a random row inserted before it. The first row
+        points at itself, or at nothing when the relation is nullable.
+        :param pks: The PKs of the rows, in insertion order
+        :param previous: The PKs of the rows inserted before them
+        :rtype: A list of the dict of the related PK by attname of each row
+        """
+        values = []
+        for index, pk in enumerate(pks):
+            count = len(previous) + index
+            row = {}
+            for field in self.self_relations:
+                if count:
+                    position = random.randrange(count)
+                    if position < len(previous):
+                        row[field.attname] = previous[position]
+                    else:
+                        row[field.attname] = pks[position - len(previous)]
+                else:
+                    row[field.attname] = None if field.null else pk
+            values.append(row)
+        return values
+
+    def update_relations(self, using, pks, fields, values):
+        """
+        Set the related PKs of the rows of $pks with a single bulk_update
+        :param values: The dict of the related PK by attname of each row
+        """
+        objs = []
+        for pk, row in zip(pks, values):
+            obj = self.model(pk=pk)
+            for attname, value in row.items():
+                setattr(obj, attname, value)
+            objs.append(obj)
+
+        manager = self.model._default_manager.db_manager(using)
+        manager.bulk_update(objs, [field.name for field in fields])
+
+    def fill_self_relations(self, using, pks, inserted_entities):
+        """
+        Second phase of the relations to the model itself, in the
+        transaction of the chunk of rows $pks
+        """
+        if self.self_relations and pks:
+            previous = inserted_entities.get(self.model) or ()
+            values = self.pick_self_relations(pks, previous)
+            self.update_relations(using, pks, self.self_relations, values)
+
+    def fill_deferred_relations(self, using, inserted_entities, batch_size):
+        """
+        Second phase of the cyclic relations: point the rows of
+        $deferred_pks at the related rows inserted since, with one
+        bulk_update per batch of $batch_size rows
+        """
+        for pks in chunked(self.deferred_pks, batch_size):
+            values = []
+            for _ in pks:
+                row = {}
+                for field in self.deferred_relations:
+                    related = inserted_entities.get(field.related_model)
+                    row[field.attname] = random.choice(related) if related else None
+                values.append(row)
+
+            with transaction.atomic(using=using):
+                self.update_relations(using, pks, self.deferred_relations, values)
+        self.deferred_pks = PrimaryKeyList()
+
+    def compile(self, stats=None):
+        """
+        Compile the field formatters into a plan, so that generating a row
+        does not have to look up any field metadata. Called before each
+        order is executed.
+        :param stats: optional ModelStats recording the time spent in each
+        formatter
+        :rtype: A tuple of FieldPlan
+        """
+        opts = self.model._meta
+        plan = []
+
+        for name, format in self.field_formatters.items():
+            field = opts.get_field(name)
+            generator = format if callable(format) else constant(format)
+            if stats is not None:
+                generator = stats.timed_formatter(name, generator)
+            plan.append(FieldPlan(name, generator, field.max_length, field.get_db_prep_save))
+
+        self.plan = tuple(plan)
+        self.column_plan = tuple(
+            field for field in self.plan if isinstance(field.generator, BatchFormatter)
+        )
+        self.row_plan = tuple(
+            field for field in self.plan if not isinstance(field.generator, BatchFormatter)
+        )
+        self.raw_plans = {}
+        return self.plan
+
+    def format_fields(self, inserted_entities):
+        """
+        Run every field formatter once and return the values of a single row
+        :param inserted_entities:
+        :rtype: dict
+        """
+        if self.plan is None:
+            self.compile()
+
+        faker_data = {}
+        for attname, generator, max_length, _ in self.plan:
+            value = generator(inserted_entities)
+
+            # max length restriction check
+            if max_length and isinstance(value, str):
+                value = value[:max_length]
+
+            faker_data[attname] = value
+
+        return faker_data
+
+    def format_rows(self, inserted_entities, number):
+        """
+        Return the values of $number rows. Formatters that can generate a
+        whole column at once (BatchFormatter) are called once per column,
+        the others once per row.
+        :param inserted_entities:
+        :param number: The number of rows
+        :rtype: A list of dicts
+        """
+        if self.plan is None:
+            self.compile()
+
+        rows = [{} for _ in range(number)]
+
+        for attname, generator, max_length, _ in self.column_plan:
+            column = generator.batch(number)
+            for faker_data, value in zip(rows, column):
+                if max_length and isinstance(value, str):
+                    value = value[:max_length]
+                faker_data[attname] = value
+
+        for faker_data in rows:
+            for attname, generator, max_length, _ in self.row_plan:
+                value = generator(inserted_entities)
+                if max_length and isinstance(value, str):
+                    value = value[:max_length]
+                faker_data[attname] = value
+
+        return rows
+
+    def check_relations(self, inserted_entities, number):
+        """
+        Make sure there are enough unused related rows for the OneToOneFields
+        before any row is inserted
+        :param inserted_entities:
+        :param number: The number of rows about to be inserted
+        """
+        for field, pool in self.one_relations.items():
+            if field.null:
+                continue
+
+            available = 0
+            if inserted_entities.get(field.related_model):
+                available = pool.available(inserted_entities[field.related_model])
+
+            if available < number:
+                message = "Field {} has only {} {} available for {} {}".format(
+                    field,
+                    available,
+                    field.related_model.__name__,
+                    number,
+                    self.model.__name__,
+                )
+                raise SeederException(message)
+
+    def get_batch_size(self, using, batch_size):
+        """
+        Clamp the requested batch size to what a single INSERT statement can
+        hold on the backend, e.g. SQLite's limit on query variables
+        :param using: A Django database connection name
+        :param batch_size: The requested number of rows per batch
+        :rtype: int
+        """
+        ops = connections[using].ops
+        fields = self.model._meta.concrete_fields
+        return max(min(batch_size, ops.bulk_batch_size(fields, range(batch_size))), 1)
+
+    def format_many_relations(self, inserted_entities):
+        """
+        Pick the related PKs of every many-to-many field for a single row
+        :rtype: dict
+        """
+        return {
+            field: func(inserted_entities)
+            for field, func in self.many_relations.items()
+        }
+
+    def add_many_relations(self, using, links):
+        """
+        Insert the many-to-many links of a set of rows with one bulk_create
+        per through model. Duplicate pairs are dropped and pairs that already
+        exist in the database are ignored.
+        :param using:
+        :param links: A list of (pk, format_many_relations() result) tuples
+        """
+        for field_name in self.many_relations:
+            field = self.model._meta.get_field(field_name)
+            through = field.remote_field.through
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+            # Self-referential symmetrical relations are stored both ways,
+            # just like RelatedManager.add() does
+            symmetrical = (
+                field.remote_field.symmetrical and field.related_model == self.model
+            )
+
+            pairs = set()
+            for pk, relations in links:
+                for related_pk in relations[field_name]:
+                    pairs.add((pk, related_pk))
+                    if symmetrical:
+                        pairs.add((related_pk, pk))
+
+            if pairs:
+                through.objects.db_manager(using=using).bulk_create(
+                    [through(**{source: s, target: t}) for s, t in pairs],
+                    ignore_conflicts=True,
+                )
+
+    def generate_rows(self, inserted_entities, number):
+        """
+        Generate $number rows without inserting them
+        :param inserted_entities:
+        :param number: The number of rows
+        :rtype: A list of (format_rows() row, format_many_relations() result)
+        tuples, the relations are None for models without many-to-many fields
+        """
+        rows = self.format_rows(inserted_entities, number)
+        if not self.many_relations:
+            return [(faker_data, None) for faker_data in rows]
+
+        return [
+            (faker_data, self.format_many_relations(inserted_entities))
+            for faker_data in rows
+        ]
+
     def execute(self, using, inserted_entities):
         """
         Execute the stages entities to insert
         :param using:
         :param inserted_entities:
         """
+        with auto_add_disabled(self.model):
+            return self.create_rows(using, self.generate_rows(inserted_entities, 1))[0]
+
+    def create_rows(self, using, rows):
+        """
+        Insert generated rows one at a time through the model manager
+        :param using:
+        :param rows: A list of generate_rows() rows
+        :rtype: A list of the inserted PKs
+        """
+        manager = self.model.objects.db_manager(using=using)
+        pks = [manager.create(**faker_data).pk for faker_data, _ in rows]
 
-        def format_field(format, inserted_entities):
-            if callable(format):
-                return format(inserted_entities)
-            return format
+        if self.many_relations:
+            self.add_many_relations(using, [
+                (pk, relations) for pk, (_, relations) in zip(pks, rows)
+            ])
 
-        def turn_off_auto_add(model):
-            for field in model._meta.fields:
-                if getattr(field, "auto_now", False):
-                    field.auto_now = False
-                if getattr(field, "auto_now_add", False):
-                    field.auto_now_add = False
+        return pks
 
+    def execute_batch(self, using, inserted_entities, number):
+        """
+        Build $number unsaved instances and insert them with a single bulk_create
+        :param using:
+        :param inserted_entities:
+        :param number: The number of rows in the batch
+        :rtype: A list of the inserted PKs, empty if the backend does not
+        return them from bulk inserts
+        """
+        return self.bulk_create_rows(using, self.generate_rows(inserted_entities, number))
+
+    def bulk_create_rows(self, using, rows):
+        """
+        Insert generated rows with a single bulk_create
+        :param using:
+        :param rows: A list of generate_rows() rows
+        :rtype: A list of the inserted PKs, empty if the backend does not
+        return them from bulk inserts
+        """
         manager = self.model.objects.db_manager(using=using)
-        turn_off_auto_add(manager.model)
+        objs = [self.model(**faker_data) for faker_data, _ in rows]
+        manager.bulk_create(objs)
 
-        faker_data = {
-            field: format_field(field_format, inserted_entities)
-            for field, field_format in self.field_formatters.items()
-        }
+        pks = [obj.pk for obj in objs if obj.pk is not None]
+        if len(pks) != len(objs):
+            if self.many_relations:
+                logging.warning(
+                    "Could not build many-to-many relationships for {}, the database "
+                    "does not return primary keys from bulk inserts".format(self.model)
+                )
+            return []
+
+        if self.many_relations:
+            self.add_many_relations(using, [
+                (pk, relations) for pk, (_, relations) in zip(pks, rows)
+            ])
+
+        return pks
 
-        # max length restriction check
-        for data_field in faker_data:
-            field = self.model._meta.get_field(data_field)
+    def raw_insert_plan(self, connection):
+        """
+        The parameterized INSERT statement used by the raw engine
+        :param connection: A Django database connection
+        :rtype: A tuple of the SQL, the fields of its columns and whether the
+        primary keys have to be allocated, or None when the model can only be
+        inserted through the ORM
+        """
+        if connection.alias not in self.raw_plans:
+            self.raw_plans[connection.alias] = self.build_raw_insert_plan(connection)
+        return self.raw_plans[connection.alias]
+
+    def build_raw_insert_plan(self, connection):
+        opts = self.model._meta
 
-            if field.max_length and isinstance(faker_data[data_field], str):
-                faker_data[data_field] = faker_data[data_field][: field.max_length]
+        # Multi-table inheritance needs one INSERT per table
+        if opts.parents or opts.proxy:
+            return None
 
-        obj = manager.create(**faker_data)
+        pk = opts.pk
+        allocate_pk = isinstance(pk, AUTO_FIELDS)
+        if not allocate_pk and not pk.has_default() and not (
+            pk.name in self.field_formatters or pk.attname in self.field_formatters
+        ):
+            return None
 
-        for field, list in self.many_relations.items():
-            list = list(inserted_entities)
-            if list:
-                for related_obj in list:
-                    getattr(obj, field).add(related_obj)
+        placeholders = []
+        for field in opts.local_concrete_fields:
+            # Field.db_returning was added in Django 3.0
+            if getattr(field, "db_returning", False) and not field.primary_key:
+                return None
 
-        return obj.pk
+            if isinstance(field, BinaryField):
+                placeholders.append(connection.ops.binary_placeholder_sql(b""))
+            elif hasattr(field, "get_placeholder"):
+                # e.g. geometry fields, their SQL depends on the value
+                return None
+            else:
+                placeholders.append("%s")
+
+        if self.plan is None:
+            self.compile()
+        converters = {field.attname: field.converter for field in self.plan}
+
+        columns = []
+        for field in opts.local_concrete_fields:
+            if field.attname in converters or field.primary_key:
+                key = field.attname
+            elif field.name in converters:
+                key = field.name
+            else:
+                key = None
+            converter = converters.get(key, field.get_db_prep_save)
+            relation_attname = field.target_field.attname if field.is_relation else None
+            columns.append((field, key, converter, relation_attname))
+
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            connection.ops.quote_name(opts.db_table),
+            ", ".join(connection.ops.quote_name(column[0].column) for column in columns),
+            ", ".join(placeholders),
+        )
+        return sql, tuple(columns), allocate_pk
+
+    def execute_raw(self, using, inserted_entities, number):
+        """
+        Insert $number rows with cursor.executemany(), without building model
+        instances
+        :param using:
+        :param inserted_entities:
+        :param number: The number of rows in the batch
+        :rtype: A list of the inserted PKs
+        """
+        return self.raw_insert_rows(using, self.generate_rows(inserted_entities, number))
+
+    def raw_insert_rows(self, using, rows):
+        """
+        Insert generated rows with cursor.executemany(). Auto-incremented
+        primary keys are allocated after the current maximum and the sequence
+        is reset afterwards, like loaddata.
+        :param using:
+        :param rows: A list of generate_rows() rows
+        :rtype: A list of the inserted PKs
+        """
+        connection = connections[using]
+        sql, columns, allocate_pk = self.raw_insert_plan(connection)
+
+        pk = self.model._meta.pk
+        manager = self.model.objects.db_manager(using=using)
+        if allocate_pk:
+            start = (manager.aggregate(max_pk=Max("pk"))["max_pk"] or 0) + 1
+
+        pks = []
+        params = []
+        for index, (data, _) in enumerate(rows):
+            if allocate_pk:
+                data[pk.attname] = start + index
+            elif pk.attname not in data and pk.name not in data:
+                data[pk.attname] = pk.get_default()
+            pks.append(data.get(pk.attname, data.get(pk.name)))
+
+            row = []
+            for field, key, converter, relation_attname in columns:
+                value = data[key] if key is not None else field.get_default()
+                if relation_attname is not None and isinstance(value, Model):
+                    value = getattr(value, relation_attname)
+                row.append(converter(value, connection))
+            params.append(tuple(row))
+
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+            if allocate_pk:
+                for statement in connection.ops.sequence_reset_sql(no_style(), [self.model]):
+                    cursor.execute(statement)
+
+        if self.many_relations:
+            self.add_many_relations(using, [
+                (pk_value, relations) for pk_value, (_, relations) in zip(pks, rows)
+            ])
+
+        return pks
+
+    def allocate_pks(self, rows, next_pks):
+        """
+        Give generated rows the PKs they would get in an empty database,
+        without one. Auto-incremented PKs are numbered after the last one
+        allocated for the model in $next_pks, other PKs use their formatter
+        or their default.
+        :param rows: A list of generate_rows() rows
+        :param next_pks: A dict of the next auto-incremented PK by model
+        :rtype: A list of the PKs
+        """
+        opts = self.model._meta
+        tables = [self.model] + opts.get_parent_list()
+        root = tables[-1]
+        allocate_pk = isinstance(root._meta.pk, AUTO_FIELDS)
+
+        pks = []
+        for data, _ in rows:
+            if allocate_pk:
+                pk = next_pks.get(root, 1)
+                next_pks[root] = pk + 1
+            elif opts.pk.attname in data or opts.pk.name in data:
+                pk = data.get(opts.pk.attname, data.get(opts.pk.name))
+                if isinstance(pk, Model):
+                    pk = pk.pk
+            elif opts.pk.has_default():
+                pk = opts.pk.get_default()
+            else:
+                message = "Cannot allocate primary keys of {}".format(self.model.__name__)
+                raise SeederException(message)
+
+            for table in tables:
+                data[table._meta.pk.attname] = pk
+            pks.append(pk)
+
+        return pks
 
 
 class Seeder(object):
-    def __init__(self, faker):
+    engines = ("orm", "raw")
+
+    def __init__(self, faker, engine="orm", pool_size=None):
         """
         :param faker: Generator
+        :param engine: "orm" to insert through the model manager, or "raw" to
+        insert plain models with cursor.executemany(). Models the raw engine
+        cannot handle are inserted through the ORM.
+        :param pool_size: optional number of values to pre-generate for each
+        guessed formatter, rows then sample from these values instead of
+        calling Faker every time
         """
+        if engine not in self.engines:
+            message = "Unknown engine {}, expected one of {}".format(engine, self.engines)
+            raise SeederException(message)
+
         self.faker = faker
+        self.engine = engine
+        self.pool_size = pool_size
         self.orders = []
+        self.relation_pools = {}
 
-    def add_entity(self, model, number, customFieldFormatters=None):
+    def add_entity(self, model, number, customFieldFormatters=None, pool_size=None,
+                   target=False):
         """
         Add an order for the generation of $number records for $entity.
         :param model: mixed A Django Model classname,
@@ -196,33 +1112,481 @@ class Seeder(object):
         :param customFieldFormatters: optional dict with field as key and
         callable as value
         :type customFieldFormatters: dict or None
+        :param pool_size: optional pool size for the guessed formatters of
+        this order, or a dict with field name as key and pool size as value.
+        Overrides the pool size of the Seeder, 0 turns pooling off.
+        :type pool_size: int, dict or None
+        :param target: $number is the number of rows the table should hold,
+        only the missing rows are seeded, see resolve_targets()
+        :type target: bool
         """
 
+        # The guessed formatters are added to the given dict, keep the custom
+        # ones to add the order again to another Seeder
+        custom_formatters = dict(customFieldFormatters) if customFieldFormatters else None
+
         # We always want to make a new ModelSeeder in case multiple unique
         # orders for a specific model are created before a single execute
-        model = ModelSeeder(model)
+        model = ModelSeeder(model, self.relation_pools)
+
+        pool_sizes = {field.name: self.pool_size for field in model.model._meta.fields}
+        if isinstance(pool_size, dict):
+            pool_sizes.update(pool_size)
+        elif pool_size is not None:
+            pool_sizes = dict.fromkeys(pool_sizes, pool_size)
 
         model.field_formatters = model.guess_field_formatters(
-            self.faker, formatters=customFieldFormatters
+            self.faker, formatters=customFieldFormatters, pool_sizes=pool_sizes
         )
 
         order = {
             "klass": model.model,
             "quantity": number,
             "entity": model,
+            "formatters": custom_formatters,
+            "pool_size": pool_size,
+            "target": target,
         }
         self.orders.append(order)
 
-    def execute(self, using=None, inserted_entities={}):
+    def resolve_targets(self, using):
+        """
+        Replace the number of rows of the orders added with a target by the
+        number of rows missing from the database $using. The orders of the
+        models that already hold enough rows are dropped.
+        """
+        counts = {}
+        orders = []
+        for order in self.orders:
+            if order["target"]:
+                klass = order["klass"]
+                if klass not in counts:
+                    counts[klass] = count_rows(klass, using)
+
+                missing = max(order["quantity"] - counts[klass], 0)
+                counts[klass] += missing
+                order = dict(order, quantity=missing, target=False)
+                if not missing:
+                    logging.debug("{} already holds enough rows".format(klass))
+                    continue
+
+            orders.append(order)
+        self.orders = orders
+
+    def clear_relation_pools(self):
+        """
+        Empty the UnusedPKPools of the OneToOneFields at the end of a run,
+        they would keep the PKs of the run in memory
+        """
+        for pool in self.relation_pools.values():
+            pool.clear()
+
+    def defer_relations(self, using=None):
+        """
+        Pick the relations of the queued orders that are seeded in two
+        phases: the relations of a model to itself, and the nullable
+        relations to a model only seeded by a later order, e.g. the models of
+        a cycle of foreign keys. See ModelSeeder.defer_relations().
+        :param using: The database connection name, None when exporting
+        """
+        can_defer = using is None or connections[using].features.can_defer_constraint_checks
+        seeded = set()
+        for index, order in enumerate(self.orders):
+            seeded.add(order["klass"])
+            later = {later_order["klass"] for later_order in self.orders[index + 1:]}
+            order["entity"].defer_relations(later - seeded, can_defer)
+
+    def mark_related_orders(self):
+        """
+        Flag the orders whose rows later orders pick related rows from, they
+        need the PKs of their inserted rows
+        """
+        for index, order in enumerate(self.orders):
+            order["related"] = any(
+                order["klass"] in self.order_dependencies(later_order)
+                for later_order in self.orders[index + 1:]
+            )
+
+    def execute(self, using=None, inserted_entities={}, batch_size=None, reservoir_size=None,
+                workers=None, stats=False, pipeline=None, existing=False):
         """
         Populate the database using all the Entity classes previously added.
+        :param using A Django database connection name, or a list of names
+        or a dict of the weight of each name to seed several databases at
+        once, see execute_databases()
+        :param batch_size: optional number of rows to insert per bulk_create,
+        rows are inserted one at a time when it is not given
+        :param reservoir_size: optional maximum number of PKs kept per model,
+        a random sample of the inserted PKs is kept once it is reached
+        :param workers: optional number of processes. Orders that do not
+        depend on each other are seeded in parallel, each process with its
+        own database connection.
+        :param stats: record the time spent in each field formatter and in
+        the database, and the number of inserted, skipped and retried rows
+        per model, in the `stats` of the result
+        :param pipeline: optional number of threads generating the next
+        chunks of rows while the current chunk is inserted
+        :param existing: pick the related rows of the models without
+        inserted rows among the rows already in the database, see
+        ExistingPrimaryKeys
+        :rtype: A SeedResult with a PrimaryKeyList of the inserted PKs per
+        model
+        """
+        if not using:
+            using = self.get_connection()
+
+        if not isinstance(using, str):
+            return self.execute_databases(using, batch_size=batch_size,
+                                          reservoir_size=reservoir_size, workers=workers,
+                                          stats=stats, pipeline=pipeline, existing=existing)
+
+        self.resolve_targets(using)
+        self.defer_relations(using)
+        self.mark_related_orders()
+        inserted_entities = {}
+        seed_stats = SeedStats() if stats else None
+        existing = ExistingPrimaryKeys(using) if existing else None
+        try:
+            if workers and workers > 1:
+                self.execute_levels(using, inserted_entities, workers, batch_size,
+                                    reservoir_size, seed_stats, pipeline, existing)
+            else:
+                orders = self.execute_orders(using, inserted_entities, batch_size,
+                                             reservoir_size=reservoir_size, stats=seed_stats,
+                                             pipeline=pipeline, existing=existing)
+                for _ in orders:
+                    pass
+        finally:
+            self.clear_relation_pools()
+
+        return SeedResult(inserted_entities, seed_stats)
+
+    def execute_databases(self, databases, **options):
+        """
+        Split the rows of every queued order between several databases and
+        seed them concurrently, each database on its own thread with its own
+        connection and its own PKs to pick related rows from. Databases that
+        cannot be seeded from another thread are seeded in turn.
+        :param databases: A list of database connection names, the rows are
+        split evenly, or a dict of the weight of each name
+        :param options: The options of execute()
+        :rtype: A dict of the SeedResult of each database
+        """
+        if not isinstance(databases, dict):
+            databases = dict.fromkeys(databases, 1)
+        if options.get("workers") and options["workers"] > 1 and len(databases) > 1:
+            raise SeederException("Several databases cannot be seeded with worker processes")
+
+        orders, self.orders = self.orders, []
+        seeders = {
+            alias: Seeder(self.faker, engine=self.engine, pool_size=self.pool_size)
+            for alias in databases
+        }
+        for order in orders:
+            quantities = split_quantity(order["quantity"], databases)
+            for alias, seeder in seeders.items():
+                if quantities[alias]:
+                    seeder.add_entity(order["klass"], quantities[alias], order["formatters"],
+                                      order["pool_size"], order["target"])
+
+        threaded = [alias for alias in seeders if self.can_thread(alias)]
+        results = {}
+        for alias in seeders:
+            if alias not in threaded:
+                results[alias] = seeders[alias].execute(using=alias, **options)
+
+        def execute(alias):
+            try:
+                return seeders[alias].execute(using=alias, **options)
+            finally:
+                # The connections of this thread
+                connections.close_all()
+
+        if threaded:
+            with ThreadPoolExecutor(len(threaded)) as executor:
+                futures = {alias: executor.submit(execute, alias) for alias in threaded}
+            for alias, future in futures.items():
+                results[alias] = future.result()
+
+        return {alias: results[alias] for alias in seeders}
+
+    @staticmethod
+    def order_dependencies(order):
+        """
+        The models an order picks related rows from
+        :rtype: set
+        """
+        entity = order["entity"]
+        opts = entity.model._meta
+        dependencies = set()
+
+        for field in opts.fields:
+            if field.is_relation and field.related_model is not None:
+                dependencies.add(field.related_model)
+
+        for field in opts.many_to_many:
+            dependencies.add(field.related_model)
+
+        return dependencies
+
+    def order_levels(self, orders):
+        """
+        Group the orders in levels. An order is placed in the level after the
+        last previous order of a model it depends on, or of the same model, so
+        the orders of a level are independent of each other.
+        :rtype: A list of lists of orders
+        """
+        levels = []
+        model_levels = {}
+
+        for order in orders:
+            models = self.order_dependencies(order) | {order["klass"]}
+            level = max(
+                (model_levels[model] + 1 for model in models if model in model_levels),
+                default=0,
+            )
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(order)
+            model_levels[order["klass"]] = level
+
+        return levels
+
+    @staticmethod
+    def can_thread(using):
+        """
+        Another thread opens its own connection, it must be to the same
+        database and must not leave a transaction of the calling thread
+        """
+        connection = connections[using]
+
+        if connection.in_atomic_block:
+            return False
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            return False
+        return True
+
+    @classmethod
+    def can_fork(cls, using):
+        """
+        Worker processes need their own connection to the same database and
+        must be able to see the rows committed by the previous levels
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return False
+        return cls.can_thread(using)
+
+    def execute_levels(self, using, inserted_entities, workers, batch_size=None,
+                       reservoir_size=None, stats=None, pipeline=None, existing=None):
+        """
+        Run the queued orders level by level, the orders of a level in
+        parallel on a pool of $workers forked processes
+        """
+        orders, self.orders = self.orders, []
+        deferred = []
+        related_entities = inserted_entities
+        if existing is not None:
+            related_entities = RelatedEntities(inserted_entities, existing)
+        parallel = self.can_fork(using)
+        if not parallel:
+            logging.warning(
+                "Cannot seed {} with worker processes, seeding sequentially".format(using)
+            )
+
+        for level in self.order_levels(orders):
+            if not parallel or len(level) == 1:
+                self.orders = level
+                for _ in self.execute_orders(using, inserted_entities, batch_size,
+                                             reservoir_size=reservoir_size, stats=stats,
+                                             pipeline=pipeline, existing=existing,
+                                             deferred=deferred):
+                    pass
+                continue
+
+            FORK_STATE.update(
+                seeder=self,
+                level=level,
+                using=using,
+                inserted_entities=inserted_entities,
+                batch_size=batch_size,
+                reservoir_size=reservoir_size,
+                stats=stats,
+                pipeline=pipeline,
+                existing=existing,
+            )
+
+            # Connections must not be shared with the forked processes,
+            # every worker opens its own
+            connections.close_all()
+            try:
+                context = multiprocessing.get_context("fork")
+                with context.Pool(min(workers, len(level))) as pool:
+                    results = pool.map(execute_forked_order, range(len(level)))
+            finally:
+                FORK_STATE.clear()
+
+            for order, (klass, pks, order_stats, taken) in zip(level, results):
+                if klass not in inserted_entities:
+                    inserted_entities[klass] = PrimaryKeyList(max_size=reservoir_size)
+                inserted_entities[klass].extend(pks)
+                if stats is not None:
+                    stats.merge(order_stats)
+
+                # The related rows used by the OneToOneFields of the worker
+                # cannot be used again by the next levels
+                for field, field_pks in taken.items():
+                    self.relation_pools[field].discard(related_entities[field.related_model], field_pks)
+
+                # The deferred relations are filled by this process, once
+                # every level was seeded
+                entity = order["entity"]
+                if entity.deferred_relations:
+                    entity.deferred_pks.extend(pks)
+                    deferred.append(entity)
+
+        for entity in deferred:
+            entity.fill_deferred_relations(using, related_entities, batch_size or ROW_CHUNK_SIZE)
+
+    def iter_execute(self, using=None, batch_size=None, chunk_size=1000, reservoir_size=None,
+                     stats=None, pipeline=None, existing=False):
+        """
+        Populate the database like execute(), yielding a SeedChunk after each
+        committed chunk of rows. Orders that have not been started when the
+        generator is closed stay queued.
         :param using A Django database connection name
-        :rtype: A list of the inserted PKs
+        :param batch_size: optional number of rows to insert per bulk_create,
+        each batch is yielded as its own chunk
+        :param chunk_size: The number of rows per chunk when rows are
+        inserted one at a time
+        :param reservoir_size: optional maximum number of PKs kept per model
+        to pick related rows from
+        :param stats: optional SeedStats to record the timings and counters
+        of the seed in, see execute()
+        :param pipeline: optional number of threads generating the next
+        chunks of rows while the current chunk is inserted
+        :param existing: pick related rows among the rows already in the
+        database too, see execute()
+        :rtype: A generator of SeedChunk
         """
+        if stats is not None and not isinstance(stats, SeedStats):
+            # Unlike execute(), there is no result to return the stats in
+            raise SeederException("iter_execute() records the stats in a SeedStats, e.g. "
+                                  "stats=SeedStats(), not in {!r}".format(stats))
+
         if not using:
             using = self.get_connection()
 
+        self.resolve_targets(using)
+        self.defer_relations(using)
+        self.mark_related_orders()
+        existing = ExistingPrimaryKeys(using) if existing else None
+        try:
+            yield from self.execute_orders(using, {}, batch_size, chunk_size, reservoir_size,
+                                           stats, pipeline, existing)
+        finally:
+            self.clear_relation_pools()
+
+    def iter_export(self, exporter, chunk_size=1000):
+        """
+        Generate the rows of the queued orders without a database and write
+        them to $exporter, yielding a SeedChunk after each chunk. The PKs are
+        allocated like in an empty database, the relations point at them.
+        The rows with cyclic relations are written last, once the related
+        rows were generated.
+        :param exporter: e.g. a JSONLinesExporter
+        :param chunk_size: The number of rows generated at once
+        :rtype: A generator of SeedChunk
+        """
+        inserted_entities = {}
+        next_pks = {}
+        deferred_rows = []
+        self.defer_relations()
+
+        try:
+            while len(self.orders):
+                order = self.orders.pop(0)
+                number = order["quantity"]
+                klass = order["klass"]
+                entity = order["entity"]
+
+                if entity.fetched_relations:
+                    message = "Cannot export {}, {} does not point at a primary key".format(
+                        klass.__name__, entity.fetched_relations[0]
+                    )
+                    raise SeederException(message)
+
+                if klass not in inserted_entities:
+                    inserted_entities[klass] = PrimaryKeyList()
+
+                entity.check_relations(inserted_entities, number)
+                entity.compile()
+
+                completed_count = 0
+                while completed_count < number:
+                    size = min(chunk_size, number - completed_count)
+                    started = time.perf_counter()
+                    rows = entity.generate_rows(inserted_entities, size)
+                    pks = PrimaryKeyList(entity.allocate_pks(rows, next_pks))
+                    if entity.self_relations:
+                        values = entity.pick_self_relations(pks, inserted_entities[klass])
+                        for (faker_data, _), row in zip(rows, values):
+                            faker_data.update(row)
+                    if entity.deferred_relations:
+                        deferred_rows.extend((entity, row) for row in rows)
+                    else:
+                        for faker_data, relations in rows:
+                            exporter.write_row(klass, faker_data, relations)
+
+                    inserted_entities[klass].extend(pks)
+                    completed_count += size
+                    yield SeedChunk(klass, pks, size, time.perf_counter() - started, 0, 0)
+
+            # Second phase of the cyclic relations, see fill_deferred_relations()
+            for entity, (faker_data, relations) in deferred_rows:
+                for field in entity.deferred_relations:
+                    related = inserted_entities.get(field.related_model)
+                    faker_data[field.attname] = random.choice(related) if related else None
+                exporter.write_row(entity.model, faker_data, relations)
+        finally:
+            self.clear_relation_pools()
+
+    def export(self, output, format=None, chunk_size=1000):
+        """
+        Write the rows of the queued orders to a file instead of the
+        database, see iter_export()
+        :param output: A directory for "csv", a path or a text stream for the
+        other formats
+        :param format: "json" (a Django fixture), "jsonl" or "csv", guessed
+        from the extension of $output when not given
+        :rtype: A SeedResult with a PrimaryKeyList of the exported PKs per
+        model
+        """
         inserted_entities = {}
+        with open_exporter(output, format) as exporter:
+            for chunk in self.iter_export(exporter, chunk_size):
+                inserted_entities.setdefault(chunk.model, PrimaryKeyList()).extend(chunk.pks)
+        return SeedResult(inserted_entities)
+
+    def execute_orders(self, using, inserted_entities, batch_size=None, chunk_size=None,
+                       reservoir_size=None, stats=None, pipeline=None, existing=None,
+                       deferred=None):
+        """
+        Run the queued orders, recording the PKs in $inserted_entities and
+        yielding a SeedChunk after each chunk
+        :param existing: optional ExistingPrimaryKeys to pick related rows
+        from when a related model has no inserted rows
+        :param deferred: optional list collecting the ModelSeeders with
+        deferred relations, filled by the caller. They are filled once the
+        queued orders are done otherwise.
+        """
+        related_entities = inserted_entities
+        if existing is not None:
+            related_entities = RelatedEntities(inserted_entities, existing)
+
+        fill_deferred = deferred is None
+        if fill_deferred:
+            deferred = []
+
         while len(self.orders):
             order = self.orders.pop(0)
             number = order["quantity"]
@@ -232,40 +1596,217 @@ class Seeder(object):
             logging.debug("Creating {} of {}".format(number, klass))
 
             if klass not in inserted_entities:
-                inserted_entities[klass] = []
+                inserted_entities[klass] = PrimaryKeyList(max_size=reservoir_size)
 
-            # Set the number of retries to double the quantity required to
-            # accomodate for potential uniqueness failures
-            attempts = number * 2
-            completed_count = 0
+            if existing is not None:
+                # Loaded now, the rows may be generated on other threads
+                for model in self.order_dependencies(order):
+                    related_entities.get(model)
+
+            entity.check_relations(related_entities, number)
+            model_stats = stats.for_model(klass) if stats is not None else None
+            entity.compile(model_stats)
 
-            # Keep track of the last error
+            # The second phase of the deferred relations, the many-to-many
+            # links and the later orders relating to this one need the PKs of
+            # the inserted rows. They are inserted one at a time when bulk
+            # inserts do not return them.
+            needs_pks = (
+                entity.self_relations or entity.deferred_relations or entity.many_relations
+                or order.get("related")
+            ) and not bulk_insert_returns_pks(connections[using])
+
+            raw = self.engine == "raw" and entity.raw_insert_plan(connections[using])
+            if raw:
+                order_chunk_size = batch_size or RAW_BATCH_SIZE
+                insert = entity.raw_insert_rows
+            elif batch_size and not needs_pks:
+                order_chunk_size = entity.get_batch_size(using, batch_size)
+                insert = entity.bulk_create_rows
+            else:
+                order_chunk_size = chunk_size or min(number, ROW_CHUNK_SIZE)
+                insert = entity.create_rows
+
+            if model_stats is not None:
+                insert = model_stats.timed_insert(insert)
+
+            completed_count = 0
+            retried = 0
             last_error = None
 
-            while attempts > 0:
-                try:
-                    # This atomic transaction block guarentees that we can
-                    # continue testing on an IntegrityError
-                    with transaction.atomic():
-                        executed_entity = entity.execute(using, inserted_entities)
-                        
-                    inserted_entities[klass].append(executed_entity)
-                    completed_count += 1
-                except IntegrityError as err:
-                    last_error = err
-                
-                # Exit if the right number of entities has been inserted
-                if completed_count == number:
-                    break
-
-                attempts -= 1
+            # Set the number of retries to double the quantity required to
+            # accomodate for potential uniqueness failures, shared by the
+            # chunks of the order
+            budget = number
+
+            chunks = self.row_chunks(order, related_entities, order_chunk_size, pipeline)
+            started = time.perf_counter()
+            try:
+                for rows in chunks:
+                    size = len(rows)
+                    with auto_add_disabled(klass):
+                        count, pks, chunk_retried, error = self.insert_chunk(
+                            entity, using, inserted_entities, rows, insert, related_entities,
+                            budget,
+                        )
+                    completed_count += count
+                    retried += chunk_retried
+                    budget -= chunk_retried
+                    last_error = error or last_error
+                    if entity.deferred_relations:
+                        entity.deferred_pks.extend(pks)
+
+                    if count:
+                        yield SeedChunk(klass, pks, count, time.perf_counter() - started,
+                                        chunk_retried, size - count)
+                    started = time.perf_counter()
+
+                    # The retry budget of the order is spent, the next chunks
+                    # would most likely fail the same way
+                    if count != size and not budget:
+                        break
+            finally:
+                chunks.close()
+
+            failed = number - completed_count
+            if model_stats is not None:
+                model_stats.inserted += completed_count
+                model_stats.skipped += failed
+                model_stats.retried += retried
+
+            if retried:
+                logging.info("{}: {} rows retried, {} failed".format(
+                    klass.__name__, retried, failed
+                ))
 
             if completed_count == 0:
                 raise IntegrityError(f"Error: could not generate any instances of {klass.__name__}\nInternal error: {last_error}")
             elif completed_count != number:
-                print(f"Warning: could only generate {completed_count} out of {number} instances of {klass.__name__}, the rest errored with; {last_error}")
+                print(f"Warning: could only generate {completed_count} out of {number} instances of {klass.__name__} ({retried} rows retried, {failed} failed), the rest errored with; {last_error}")
+
+            if entity.deferred_relations:
+                deferred.append(entity)
+
+        if fill_deferred:
+            for entity in deferred:
+                entity.fill_deferred_relations(using, related_entities, batch_size or ROW_CHUNK_SIZE)
+
+    def row_chunks(self, order, inserted_entities, chunk_size, pipeline=None):
+        """
+        The generated rows of an order, in chunks of $chunk_size rows. With
+        $pipeline threads, the chunks are generated ahead in a RowPipeline,
+        unless the rows relate to their own model or need queries.
+        :rtype: A generator of lists of generate_rows() rows
+        """
+        entity = order["entity"]
+        number = order["quantity"]
+        sizes = [min(chunk_size, number - start) for start in range(0, number, chunk_size)]
 
-        return inserted_entities
+        if (pipeline and len(sizes) > 1 and not entity.fetched_relations
+                and order["klass"] not in self.order_dependencies(order)):
+            yield from RowPipeline(entity, inserted_entities, sizes, pipeline)
+            return
+
+        for size in sizes:
+            yield entity.generate_rows(inserted_entities, size)
+
+    def insert_chunk(self, entity, using, inserted_entities, rows, insert,
+                     related_entities=None, budget=None):
+        """
+        Insert generated rows in a single transaction. When it fails on an
+        IntegrityError, the rows are bisected in savepoints to isolate the
+        offending ones, which are regenerated as long as the retry budget
+        allows.
+        :param rows: A list of generate_rows() rows
+        :param insert: The ModelSeeder method inserting a list of generated
+        rows, e.g. create_rows
+        :param related_entities: The PKs to pick the related rows of the
+        regenerated rows from, $inserted_entities by default
+        :param budget: The number of rows that can still be regenerated, the
+        number of rows of the chunk by default
+        :rtype: A tuple of the number of inserted rows, their PKs, the number
+        of retried rows and the last error
+        """
+        number = len(rows)
+        if related_entities is None:
+            related_entities = inserted_entities
+        if budget is None:
+            budget = number
+
+        # The relations of the rows to their own model are filled before the
+        # chunk commits
+        try:
+            with transaction.atomic(using=using):
+                pks = PrimaryKeyList(insert(using, rows))
+                entity.fill_self_relations(using, pks, related_entities)
+            count, retried, last_error = number, 0, None
+        except IntegrityError as err:
+            with transaction.atomic(using=using):
+                count, pks, retried, last_error = self.retry_chunk(
+                    entity, using, related_entities, rows, insert, err, budget
+                )
+                entity.fill_self_relations(using, pks, related_entities)
+
+        inserted_entities[entity.model].extend(pks)
+        return count, pks, retried, last_error
+
+    def retry_chunk(self, entity, using, inserted_entities, rows, insert, error, attempts):
+        """
+        Insert the rows of a failed chunk, regenerating the rows that fail
+        until $attempts rows were regenerated
+        """
+        count = retried = 0
+        pks = PrimaryKeyList()
+
+        last_error = error
+        while rows:
+            (inserted, inserted_pks), failed, error = self.insert_bisect(
+                using, rows, insert, error
+            )
+            count += inserted
+            pks.extend(inserted_pks)
+            last_error = error or last_error
+            error = None
+
+            size = min(failed, attempts)
+            if not size:
+                break
+            attempts -= size
+            retried += size
+            rows = entity.generate_rows(inserted_entities, size)
+
+        return count, pks, retried, last_error
+
+    def insert_bisect(self, using, rows, insert, error=None):
+        """
+        Insert $rows in a savepoint, splitting them in halves when it fails
+        on an IntegrityError until the offending rows are isolated
+        :param error: The IntegrityError $rows are already known to fail with
+        :rtype: A tuple of ((number of inserted rows, their PKs), the number
+        of failed rows, the last error)
+        """
+        if error is None:
+            try:
+                with transaction.atomic(using=using):
+                    return (len(rows), insert(using, rows)), 0, None
+            except IntegrityError as err:
+                error = err
+
+        if len(rows) == 1:
+            return (0, []), 1, error
+
+        middle = len(rows) // 2
+        (first_count, first_pks), first_failed, first_error = self.insert_bisect(
+            using, rows[:middle], insert
+        )
+        (second_count, second_pks), second_failed, second_error = self.insert_bisect(
+            using, rows[middle:], insert
+        )
+        return (
+            (first_count + second_count, first_pks + second_pks),
+            first_failed + second_failed,
+            second_error or first_error or error,
+        )
 
     def get_connection(self):
         """
@@ -279,4 +1820,4 @@ class Seeder(object):
             raise SeederException(message)
         klass = list(klasses)[0]
 
-        return klass.objects._db
+        return klass.objects._db or router.db_for_write(klass)
@@ -0,0 +1,276 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+from itertools import islice
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import uuid
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import BinaryField
+from django.db.utils import IntegrityError
+from django.utils.dateparse import parse_date, parse_datetime, parse_time
+
+from django_seed.primary_keys import PrimaryKeyList
+
+
+# Part of every key, bumped whenever the format of the snapshots changes
+SNAPSHOT_VERSION = 2
+
+# Rows per line of a snapshot, and per executemany() call when it is
+# restored
+SNAPSHOT_CHUNK_SIZE = 5000
+
+# The functions reading back the values encoded by encode_value(), by the
+# internal type of their field. The values of the other fields are stored
+# as they are.
+DECODERS = {
+    "BinaryField": base64.b64decode,
+    "DateField": parse_date,
+    "DateTimeField": parse_datetime,
+    "DecimalField": Decimal,
+    "DurationField": lambda value: timedelta(microseconds=value),
+    "TimeField": parse_time,
+    "UUIDField": uuid.UUID,
+}
+
+
+def snapshot_tables(model):
+    """
+    The tables holding the rows of $model: the tables of its multi-table
+    inheritance parents first, its own table, then the tables of its
+    many-to-many relations
+    :rtype: A list of (table model, name of the field of the table pointing
+    at $model) tuples
+    """
+    opts = model._meta
+    tables = [(parent, parent._meta.pk.attname) for parent in reversed(opts.get_parent_list())]
+    tables.append((model, opts.pk.attname))
+
+    for field in opts.many_to_many:
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name())
+        tables.append((through, source.attname))
+
+    return tables
+
+
+def chunked(pks, size):
+    """
+    Iterate over $pks in lists of at most $size PKs
+    """
+    pks = iter(pks)
+    chunk = list(islice(pks, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(pks, size))
+
+
+def encode_value(value):
+    """
+    The JSON representation of a column value that JSON has no type for,
+    read back by the DECODERS of its field
+    """
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value // timedelta(microseconds=1)
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return base64.b64encode(value).decode()
+    raise TypeError("Cannot snapshot a value of type {}".format(type(value).__name__))
+
+
+def value_decoder(field):
+    """
+    The function reading back the values of $field, the field a relation
+    points at for relations
+    :rtype: A function, None when the values are stored as they are
+    """
+    while field.is_relation:
+        field = field.target_field
+    return DECODERS.get(field.get_internal_type())
+
+
+def schema(model):
+    """
+    A description of the columns of every table of $model, vendor neutral
+    """
+    return [
+        [
+            table._meta.label,
+            table._meta.db_table,
+            [
+                [field.column, field.get_internal_type(), field.null]
+                for field in table._meta.local_concrete_fields
+            ],
+        ]
+        for table, _ in snapshot_tables(model)
+    ]
+
+
+class SnapshotCache(object):
+    """
+    Snapshots of seeded tables in $directory, keyed on the schema of the
+    seeded models, the number of rows of each order and the faker seed. A
+    snapshot is a gzipped JSON document per line: the columns of a table,
+    then its rows in chunks, each restored with one executemany() instead
+    of generating the rows again.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def key(self, orders, seed=None, extra=None):
+        """
+        :param orders: The orders of a Seeder
+        :param seed: The seed of the faker and the random module, when it
+        was fixed
+        :param extra: optional JSON serializable value that changes the
+        generated rows too, e.g. the fields forced to a value
+        :rtype: str
+        """
+        description = {
+            "version": SNAPSHOT_VERSION,
+            "orders": [
+                [order["klass"]._meta.label, order["quantity"], schema(order["klass"])]
+                for order in orders
+            ],
+            "seed": seed,
+            "extra": extra,
+        }
+        encoded = json.dumps(description, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, "{}.snapshot".format(key))
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def save(self, key, inserted_entities, using):
+        """
+        Dump the rows of $inserted_entities from the database. The file is
+        written next to its final path and moved there once complete.
+        :param inserted_entities: The PrimaryKeyList of the inserted PKs by
+        model, e.g. the result of Seeder.execute()
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        connection = connections[using]
+        chunk_size = min(
+            SNAPSHOT_CHUNK_SIZE, connection.features.max_query_params or SNAPSHOT_CHUNK_SIZE
+        )
+
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with gzip.open(os.fdopen(descriptor, "wb"), "wt", encoding="utf-8") as output:
+                def write(*record):
+                    output.write(json.dumps(record, default=encode_value))
+                    output.write("\n")
+
+                for model, pks in inserted_entities.items():
+                    for table, link in snapshot_tables(model):
+                        attnames = [field.attname for field in table._meta.local_concrete_fields]
+                        write("table", table._meta.label, attnames, table is model)
+
+                        queryset = table._default_manager.db_manager(using).order_by()
+                        for chunk in chunked(pks, chunk_size):
+                            rows = list(queryset.filter(**{link + "__in": chunk}).values_list(*attnames))
+                            if rows:
+                                write("rows", rows)
+
+                write("end")
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def restore(self, key, using):
+        """
+        Insert the rows of a snapshot, in a single transaction
+        :rtype: A dict of the PrimaryKeyList of the restored PKs by seeded
+        model, or None when there is no snapshot for $key or its rows
+        conflict with the rows in the database
+        """
+        if not self.exists(key):
+            return None
+
+        connection = connections[using]
+        inserted_entities = {}
+        tables = []
+
+        try:
+            with transaction.atomic(using=using), \
+                    gzip.open(self.path(key), "rt", encoding="utf-8") as snapshot:
+                with connection.cursor() as cursor:
+                    while True:
+                        record = json.loads(snapshot.readline())
+                        if record[0] == "end":
+                            break
+                        if record[0] == "table":
+                            _, label, attnames, seeded = record
+                            table = apps.get_model(label)
+                            sql, converters = self.insert_plan(connection, table, attnames)
+                            pk_index = attnames.index(table._meta.pk.attname)
+                            tables.append(table)
+                            restored = None
+                            if seeded:
+                                restored = inserted_entities.setdefault(table, PrimaryKeyList())
+                            continue
+
+                        rows = record[1]
+                        cursor.executemany(sql, [
+                            tuple(convert(value, connection) for convert, value in zip(converters, row))
+                            for row in rows
+                        ])
+                        if restored is not None:
+                            restored.extend(row[pk_index] for row in rows)
+
+                    for statement in connection.ops.sequence_reset_sql(no_style(), tables):
+                        cursor.execute(statement)
+        except IntegrityError as err:
+            logging.warning("Could not restore the snapshot {}: {}".format(key, err))
+            return None
+
+        return inserted_entities
+
+    @staticmethod
+    def insert_plan(connection, table, attnames):
+        """
+        The INSERT statement of a table of a snapshot and the function
+        converting the values of each column
+        """
+        def converter(field):
+            decode = value_decoder(field)
+            if decode is None:
+                return field.get_db_prep_save
+
+            def convert(value, connection):
+                if value is not None:
+                    value = decode(value)
+                return field.get_db_prep_save(value, connection)
+
+            return convert
+
+        opts = table._meta
+        fields = [
+            next(field for field in opts.local_concrete_fields if field.attname == attname)
+            for attname in attnames
+        ]
+        placeholders = [
+            connection.ops.binary_placeholder_sql(b"") if isinstance(field, BinaryField) else "%s"
+            for field in fields
+        ]
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            connection.ops.quote_name(opts.db_table),
+            ", ".join(connection.ops.quote_name(field.column) for field in fields),
+            ", ".join(placeholders),
+        )
+        return sql, [converter(field) for field in fields]
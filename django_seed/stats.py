@@ -0,0 +1,129 @@
+from threading import Lock
+from time import perf_counter
+
+from django_seed.guessers import BatchFormatter
+
+
+class ModelStats(object):
+    """
+    Counters and timings of the orders of a single model
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.inserted = 0
+        self.skipped = 0
+        self.retried = 0
+        self.db_time = 0.0
+        self.field_times = {}
+        # Formatters may run on the threads of a RowPipeline
+        self.lock = Lock()
+
+    def __getstate__(self):
+        # Sent back by the worker processes, without the lock
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = Lock()
+
+    @property
+    def format_time(self):
+        return sum(self.field_times.values())
+
+    def add_field_time(self, name, seconds):
+        with self.lock:
+            self.field_times[name] = self.field_times.get(name, 0.0) + seconds
+
+    def timed_formatter(self, name, formatter):
+        """
+        Wrap a field formatter so that the time spent in it is recorded
+        """
+        def timed(inserted_entities):
+            started = perf_counter()
+            try:
+                return formatter(inserted_entities)
+            finally:
+                self.add_field_time(name, perf_counter() - started)
+
+        if not isinstance(formatter, BatchFormatter):
+            return timed
+
+        def timed_batch(number):
+            started = perf_counter()
+            try:
+                return formatter.batch(number)
+            finally:
+                self.add_field_time(name, perf_counter() - started)
+
+        return BatchFormatter(timed, timed_batch)
+
+    def timed_insert(self, insert):
+        """
+        Wrap a ModelSeeder insert method so that the time spent in the
+        database is recorded, including the attempts that failed
+        """
+        def timed(using, rows):
+            started = perf_counter()
+            try:
+                return insert(using, rows)
+            finally:
+                self.db_time += perf_counter() - started
+
+        return timed
+
+    def merge(self, other):
+        self.inserted += other.inserted
+        self.skipped += other.skipped
+        self.retried += other.retried
+        self.db_time += other.db_time
+        for name, seconds in other.field_times.items():
+            self.add_field_time(name, seconds)
+
+    def format(self):
+        """
+        A human readable summary, the slowest fields first
+        :rtype: str
+        """
+        lines = [
+            "{}: {} inserted, {} skipped, {} retried, {:.3f}s in the database, "
+            "{:.3f}s in formatters".format(
+                self.model.__name__, self.inserted, self.skipped, self.retried,
+                self.db_time, self.format_time,
+            )
+        ]
+        fields = sorted(self.field_times.items(), key=lambda item: item[1], reverse=True)
+        for name, seconds in fields:
+            lines.append("    {}: {:.3f}s".format(name, seconds))
+        return "\n".join(lines)
+
+
+class SeedStats(dict):
+    """
+    The ModelStats of a seed, by model
+    """
+
+    def for_model(self, model):
+        if model not in self:
+            self[model] = ModelStats(model)
+        return self[model]
+
+    def merge(self, other):
+        for model, model_stats in other.items():
+            self.for_model(model).merge(model_stats)
+
+    def format(self):
+        return "\n".join(model_stats.format() for model_stats in self.values())
+
+
+class SeedResult(dict):
+    """
+    The PKs inserted by Seeder.execute() by model, with the SeedStats of the
+    seed when they were requested
+    """
+
+    def __init__(self, inserted_entities, stats=None):
+        super(SeedResult, self).__init__(inserted_entities)
+        self.stats = stats
@@ -1,30 +1,53 @@
+import gzip
+import itertools
+import json
+import multiprocessing
+import os
 import random
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from types import SimpleNamespace
 
 from alphabet_detector import AlphabetDetector
 from django import VERSION as django_version
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.core.management import call_command
+from django.core.management.base import OutputWrapper
 from django.core.validators import validate_comma_separated_integer_list
-from django.db import models
+from django.db import connection, models
 from django.db.utils import IntegrityError
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext, isolate_apps
 from django.utils import timezone
 from faker import Faker
 from jsonfield import JSONField
 
 from django_seed import Seed
 from django_seed.exceptions import SeederCommandError, SeederException
-from django_seed.guessers import FieldTypeGuesser, NameGuesser
-from django_seed.seeder import Seeder
+from django_seed.management.commands.seed import Command, ProgressReporter
+from django_seed.guessers import BatchFormatter, FieldTypeGuesser, NameGuesser, PooledFormatter
+from django_seed.primary_keys import ExistingPrimaryKeys, PrimaryKeyList
+from django_seed.providers import ColumnProvider, LazyFaker
+from django_seed.stats import SeedStats
+from django_seed.seeder import (
+    FORK_STATE, GUESSED_FORMATTERS, ModelSeeder, RowPipeline, Seeder, bulk_insert_returns_pks,
+    count_rows, execute_forked_order, split_quantity
+)
+from django_seed.snapshots import SnapshotCache
 
 try:
     from django.utils.unittest import TestCase
 except:
     from django.test import TestCase
 
-from unittest import skipIf
+from unittest import mock, skipIf, skipUnless
 
 fake = Faker()
 
@@ -134,10 +157,31 @@ class Newspaper(models.Model):
     reporters = models.ManyToManyField(Reporter)
 
 
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    description = models.TextField()
+
+
 class NotCoveredFields(models.Model):
     json = JSONField()
 
 
+class Category(models.Model):
+    name = models.CharField(max_length=50)
+    parent = models.ForeignKey('self', on_delete=models.CASCADE, related_name='children')
+
+
+# A team and its members point at each other
+class Team(models.Model):
+    name = models.CharField(max_length=50)
+    captain = models.ForeignKey('Member', null=True, on_delete=models.SET_NULL, related_name='+')
+
+
+class Member(models.Model):
+    name = models.CharField(max_length=50)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+
+
 # This model should only be created when Postgres is being used
 class PhoneNumberPerson(models.Model):
     phones = ArrayField(
@@ -167,6 +211,28 @@ class NameGuesserTestCase(TestCase):
                 value = self.instance.guess_format(name)(datetime.now())
                 self.assertFalse(timezone.is_aware(value))
 
+    def test_guess_format_rules(self):
+        self.assertIsInstance(self.instance.guess_format('is_active'), BatchFormatter)
+        self.assertIsInstance(self.instance.guess_format('Email')(None), str)
+        self.assertIsNone(self.instance.guess_format('isotope'))
+        self.assertIsNone(self.instance.guess_format('score'))
+
+    def test_register(self):
+        try:
+            NameGuesser.register(('score', 'points'), lambda guesser: lambda x: 42)
+            self.assertEqual(self.instance.guess_format('Points')(None), 42)
+        finally:
+            del NameGuesser.names['score'], NameGuesser.names['points']
+        self.assertIsNone(self.instance.guess_format('points'))
+
+
+class RatingField(models.IntegerField):
+    pass
+
+
+class StarRatingField(RatingField):
+    pass
+
 
 class FieldTypeGuesserTestCase(TestCase):
 
@@ -184,6 +250,38 @@ class FieldTypeGuesserTestCase(TestCase):
             value = generator(datetime.now())
             self.assertFalse(timezone.is_aware(value))
 
+    def test_guess_batch_formats(self):
+        fields = (
+            (models.IntegerField(), int),
+            (models.SmallIntegerField(), int),
+            (models.BigIntegerField(), int),
+            (models.FloatField(), float),
+            (models.DecimalField(), float),
+            (models.BooleanField(), bool),
+            (models.DateField(), date),
+            (models.DateTimeField(), datetime),
+            (models.TimeField(), time),
+            (models.DurationField(), timedelta),
+        )
+
+        for field, value_type in fields:
+            generator = self.instance.guess_format(field)
+            self.assertIsInstance(generator, BatchFormatter)
+            column = generator.batch(20)
+            self.assertEqual(len(column), 20)
+            self.assertTrue(all(isinstance(value, value_type) for value in column), field)
+
+        field = models.CharField(max_length=4, choices=Action.ACTIONS)
+        column = self.instance.guess_format(field).batch(50)
+        self.assertTrue(set(column) <= {'fire', 'move', 'stop'})
+
+    def test_column_provider_ranges(self):
+        for use_numpy in (False, True):
+            columns = ColumnProvider(fake, use_numpy=use_numpy)
+            self.assertTrue(all(0 <= value <= 32767 for value in columns.rand_small_int(100, pos=True)))
+            self.assertTrue(all(0 <= value < 1 for value in columns.rand_float(100)))
+            self.assertTrue(all(value <= datetime.now() for value in columns.date_time(100)))
+
     def test_guess_json_format(self):
         import json
         try:
@@ -195,6 +293,40 @@ class FieldTypeGuesserTestCase(TestCase):
         result = generator({}, data_columns={'name': 'first_name_nonbinary'}, num_rows=1)
         self.assertIn('name', json.loads(result))
 
+    def test_subclass_resolved_along_mro(self):
+        self.assertIs(
+            FieldTypeGuesser.resolve(models.EmailField),
+            FieldTypeGuesser.formats[models.EmailField],
+        )
+        self.assertIs(
+            FieldTypeGuesser.resolve(StarRatingField),
+            FieldTypeGuesser.formats[models.IntegerField],
+        )
+        self.assertIn(StarRatingField, FieldTypeGuesser.resolved)
+
+    def test_register(self):
+        @FieldTypeGuesser.register(RatingField)
+        def rating_format(guesser, field):
+            return BatchFormatter(lambda x: 3, lambda n: [5] * n)
+
+        try:
+            generator = self.instance.guess_format(StarRatingField())
+            self.assertEqual(generator(None), 3)
+            self.assertEqual(generator.batch(2), [5, 5])
+        finally:
+            del FieldTypeGuesser.formats[RatingField]
+            FieldTypeGuesser.resolved.clear()
+
+        self.assertNotEqual(self.instance.guess_format(StarRatingField()).batch(2), [5, 5])
+
+    def test_guess_array_format(self):
+        generator = self.instance.guess_format(ArrayField(models.IntegerField()))
+        self.assertIsInstance(generator(None)[0], int)
+
+    def test_unknown_field(self):
+        with self.assertRaises(AttributeError):
+            self.instance.guess_format(models.Field())
+
 
 class SeederTestCase(TestCase):
 
@@ -209,6 +341,254 @@ class SeederTestCase(TestCase):
         self.assertEqual(len(seeder.execute()[Game]), 40)
         self.assertEqual(len(Game.objects.all()), 50)
 
+    def test_population_batched(self):
+        faker = fake
+        seeder = Seeder(faker)
+        seeder.add_entity(Game, 50)
+        inserted_pks = seeder.execute(batch_size=7)
+        self.assertEqual(Game.objects.count(), 50)
+
+        if bulk_insert_returns_pks(connection):
+            self.assertEqual(len(inserted_pks[Game]), 50)
+
+    def test_bulk_insert_returns_pks(self):
+        # Django 2.2 names the feature can_return_ids_from_bulk_insert
+        old = SimpleNamespace(features=SimpleNamespace(can_return_ids_from_bulk_insert=True))
+        self.assertTrue(bulk_insert_returns_pks(old))
+        new = SimpleNamespace(features=SimpleNamespace(can_return_rows_from_bulk_insert=False))
+        self.assertFalse(bulk_insert_returns_pks(new))
+
+    def test_population_batched_related(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 10)
+        seeder.add_entity(Player, 20)
+        result = seeder.execute(batch_size=7)
+
+        self.assertEqual(len(result[Game]), 10)
+        self.assertEqual(Player.objects.count(), 20)
+        self.assertTrue(set(Player.objects.values_list('game_id', flat=True)) <= set(result[Game]))
+
+    def test_batch_size_respects_backend_limits(self):
+        entity = ModelSeeder(Game)
+        batch_size = entity.get_batch_size('default', 10 ** 6)
+        ops = connection.ops
+        fields = Game._meta.concrete_fields
+        self.assertEqual(batch_size, ops.bulk_batch_size(fields, range(10 ** 6)))
+        self.assertEqual(entity.get_batch_size('default', 5), 5)
+
+    def test_iter_execute(self):
+        faker = fake
+        seeder = Seeder(faker)
+        seeder.add_entity(Game, 25)
+        seeder.add_entity(Player, 10)
+
+        chunks = list(seeder.iter_execute(chunk_size=10))
+        self.assertEqual([(c.model, c.count) for c in chunks], [
+            (Game, 10), (Game, 10), (Game, 5), (Player, 10),
+        ])
+        self.assertEqual(Game.objects.count(), 25)
+        self.assertEqual(
+            sorted(pk for c in chunks if c.model is Game for pk in c.pks),
+            sorted(Game.objects.values_list('pk', flat=True)),
+        )
+        self.assertTrue(all(c.elapsed >= 0 for c in chunks))
+
+    def test_iter_execute_stats(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 2)
+        with self.assertRaises(SeederException):
+            next(seeder.iter_execute(stats=True))
+        self.assertEqual(Tag.objects.count(), 0)
+
+    def test_iter_execute_stop_early(self):
+        faker = fake
+        seeder = Seeder(faker)
+        seeder.add_entity(Game, 20)
+        seeder.add_entity(Customer, 5)
+
+        for chunk in seeder.iter_execute(chunk_size=5):
+            break
+
+        self.assertEqual(Game.objects.count(), 5)
+        self.assertEqual(Customer.objects.count(), 0)
+        self.assertEqual([order['klass'] for order in seeder.orders], [Customer])
+
+    def test_order_levels(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Pen, 2)
+        seeder.add_entity(Game, 2)
+        seeder.add_entity(Reporter, 2)
+        seeder.add_entity(Customer, 2)
+        seeder.add_entity(Player, 2)
+        seeder.add_entity(Game, 2)
+
+        levels = seeder.order_levels(seeder.orders)
+        self.assertEqual([[order['klass'] for order in level] for level in levels], [
+            [Pen, Game, Customer],
+            [Reporter, Player, Game],
+        ])
+
+    def test_execute_workers(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Pen, 3)
+        seeder.add_entity(Game, 3)
+        seeder.add_entity(Reporter, 3)
+
+        # The in-memory test database cannot be shared with worker
+        # processes, the levels are seeded one after another
+        result = seeder.execute(workers=2)
+        self.assertEqual(len(result[Reporter]), 3)
+        self.assertEqual(Game.objects.count(), 3)
+        self.assertEqual(seeder.orders, [])
+
+    def test_raw_engine(self):
+        seeder = Seeder(fake, engine='raw')
+        seeder.add_entity(Game, 30)
+        seeder.add_entity(Player, 20, {
+            'score': lambda x: random.randint(0, 1000),
+        })
+        seeder.add_entity(Action, 20)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = seeder.execute(batch_size=10)
+
+        game_inserts = [q for q in queries if 'INSERT INTO "django_seed_game"' in q['sql']]
+        self.assertEqual(len(game_inserts), 3)
+        self.assertEqual(sorted(result[Game]), sorted(Game.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(result[Player]), 20)
+        self.assertTrue(all(0 <= p.score <= 1000 for p in Player.objects.all()))
+        self.assertTrue(set(Action.objects.values_list('actor_id', flat=True)) <= set(result[Player]))
+
+        # Rows inserted through the ORM afterwards get the next free keys
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 1)
+        self.assertNotIn(seeder.execute()[Game][0], result[Game])
+
+    def test_raw_engine_many_to_many(self):
+        seeder = Seeder(fake, engine='raw')
+        seeder.add_entity(Pen, 3)
+        seeder.add_entity(Reporter, 3)
+        seeder.add_entity(Article, 2)
+        seeder.add_entity(Newspaper, 2)
+        result = seeder.execute()
+
+        self.assertEqual(Newspaper.objects.count(), 2)
+        for newspaper in Newspaper.objects.all():
+            self.assertTrue(set(newspaper.reporters.values_list('pk', flat=True)) <= set(result[Reporter]))
+
+    def test_export_jsonl(self):
+        import json
+
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 3)
+        seeder.add_entity(Player, 5)
+        seeder.add_entity(Action, 10)
+
+        output = StringIO()
+        with self.assertNumQueries(0):
+            exported = seeder.export(output, format='jsonl')
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(records), 18)
+        self.assertEqual(list(exported[Game]), [1, 2, 3])
+        self.assertEqual(list(exported[Action]), list(range(1, 11)))
+
+        players = [record for record in records if record['model'] == 'django_seed.player']
+        self.assertTrue(all(record['fields']['game'] in (1, 2, 3) for record in players))
+        self.assertEqual(Game.objects.count(), 0)
+
+    def test_export_fixture(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Pen, 5)
+        seeder.add_entity(Reporter, 5)
+        seeder.add_entity(Article, 5)
+        seeder.add_entity(Newspaper, 5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'fixture.json')
+            seeder.export(path)
+            call_command('loaddata', path, verbosity=0)
+
+        self.assertEqual(Newspaper.objects.count(), 5)
+        self.assertTrue(all(newspaper.reporters.exists() for newspaper in Newspaper.objects.all()))
+
+    def test_export_csv(self):
+        import csv
+
+        seeder = Seeder(fake)
+        seeder.add_entity(Customer, 4)
+
+        with tempfile.TemporaryDirectory() as directory:
+            seeder.export(os.path.join(directory, 'export'))
+            with open(os.path.join(directory, 'export', 'django_seed.customer.csv')) as export:
+                rows = list(csv.DictReader(export))
+
+        self.assertEqual([row['pk'] for row in rows], ['1', '2', '3', '4'])
+        self.assertTrue(all(row['name'] for row in rows))
+
+    def test_export_unknown_format(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Customer, 1)
+        with self.assertRaises(SeederException):
+            seeder.export('customers.xml')
+
+        # A stream has no extension, the format has to be given
+        with self.assertRaises(SeederException):
+            seeder.export(StringIO())
+        with self.assertRaises(SeederException):
+            seeder.export(StringIO(), format='csv')
+
+    def test_pipeline(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 10)
+        seeder.add_entity(Player, 25)
+        seeder.add_entity(Action, 50)
+
+        with mock.patch('django_seed.seeder.RowPipeline', wraps=RowPipeline) as pipeline:
+            chunks = list(seeder.iter_execute(chunk_size=7, pipeline=2))
+        self.assertEqual(pipeline.call_count, 3)
+
+        self.assertEqual(sum(chunk.count for chunk in chunks), 85)
+        self.assertEqual(Action.objects.count(), 50)
+        self.assertEqual(sorted(chunk.count for chunk in chunks if chunk.model is Game), [3, 7])
+        self.assertTrue(all(action.actor.game_id for action in Action.objects.all()))
+
+    def test_pipeline_errors(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Action, 10)
+        with self.assertRaises(SeederException):
+            list(seeder.iter_execute(chunk_size=3, pipeline=1))
+        self.assertEqual(Action.objects.count(), 0)
+
+    def test_pipeline_stops_generating(self):
+        entity = ModelSeeder(Pen)
+        entity.field_formatters = entity.guess_field_formatters(fake)
+        pipeline = RowPipeline(entity, {}, [1] * 100, depth=1)
+        rows = iter(pipeline)
+        next(rows)
+        rows.close()
+        self.assertFalse(any(thread.is_alive() for thread in pipeline.threads))
+
+    def test_unknown_engine(self):
+        self.assertRaises(SeederException, Seeder, fake, engine='sql')
+
+    def test_batch_formatters_are_called_once_per_column(self):
+        calls = []
+
+        def likes(n):
+            calls.append(n)
+            return list(range(n))
+
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 12, {
+            'likes': BatchFormatter(lambda x: 0, likes),
+        })
+        entity = seeder.orders[0]['entity']
+        rows = entity.format_rows({}, 12)
+
+        self.assertEqual(calls, [12])
+        self.assertEqual([row['likes'] for row in rows], list(range(12)))
+
     def test_same_model_unique_fields(self):
         faker = fake
         seeder = Seeder(faker)
@@ -314,6 +694,70 @@ class SeederTestCase(TestCase):
         games = Game.objects.filter(pk__in=inserted_pks)
         self.assertTrue(all(game.created_at == date for game in games))
 
+    def test_model_seeder_execute_auto_now(self):
+        date = datetime(1957, 3, 6, 13, 13)
+        entity = ModelSeeder(Game)
+        entity.field_formatters = entity.guess_field_formatters(fake)
+        entity.field_formatters.update({'created_at': date, 'updated_at': date})
+        pk = entity.execute('default', {})
+
+        game = Game.objects.get(pk=pk)
+        self.assertEqual((game.created_at, game.updated_at), (date, date))
+        self.assertTrue(Game._meta.get_field('updated_at').auto_now)
+
+    def test_auto_now_restored(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 2)
+        seeder.execute()
+
+        self.assertTrue(Game._meta.get_field('created_at').auto_now_add)
+        self.assertTrue(Game._meta.get_field('updated_at').auto_now)
+
+    def test_compiled_plan(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Customer, 5, {'name': 'x' * 300})
+        entity = seeder.orders[0]['entity']
+        plan = {field.attname: field for field in entity.compile()}
+
+        self.assertEqual(plan['name'].max_length, 255)
+        self.assertEqual(plan['comments'].max_length, 500)
+        self.assertIsNone(plan['created_at'].max_length)
+
+        with mock.patch.object(Customer._meta, 'get_field') as get_field:
+            rows = entity.format_rows({}, 5)
+            entity.format_fields({})
+        get_field.assert_not_called()
+        self.assertTrue(all(row['name'] == 'x' * 255 for row in rows))
+
+    def test_guessed_formatters_are_cached(self):
+        GUESSED_FORMATTERS.clear()
+        with mock.patch.object(FieldTypeGuesser, 'guess_format',
+                               wraps=FieldTypeGuesser(fake).guess_format) as guess_format:
+            seeder = Seeder(fake)
+            seeder.add_entity(Customer, 1)
+            guesses = guess_format.call_count
+            seeder.add_entity(Customer, 1)
+            seeder.add_entity(Customer, 1, {'comments': 'custom'})
+            self.assertEqual(guess_format.call_count, guesses)
+
+        self.assertEqual(seeder.orders[2]['entity'].field_formatters['comments'], 'custom')
+        self.assertIs(
+            seeder.orders[0]['entity'].field_formatters['comments'],
+            seeder.orders[1]['entity'].field_formatters['comments'],
+        )
+        self.assertEqual(len(seeder.execute()[Customer]), 3)
+
+    def test_guessed_formatters_cleared_with_app_registry(self):
+        Seeder(fake).add_entity(Customer, 1)
+        self.assertTrue(GUESSED_FORMATTERS)
+
+        # Registered in a throwaway app registry, not in the django_seed app
+        with isolate_apps('django_seed'):
+            class Registered(models.Model):
+                pass
+
+        self.assertFalse(GUESSED_FORMATTERS)
+
     def test_auto_now(self):
         date = datetime(1957, 3, 6, 13, 13)
         faker = fake
@@ -326,6 +770,383 @@ class SeederTestCase(TestCase):
         games = Game.objects.filter(pk__in=inserted_pks)
         self.assertTrue(all(game.updated_at == date for game in games))
 
+    def test_execute_target(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 5, target=True)
+        self.assertEqual(len(seeder.execute()[Game]), 5)
+
+        # The table already holds the rows, only counted
+        seeder.add_entity(Game, 5, target=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(dict(seeder.execute()), {})
+
+        seeder.add_entity(Game, 8, target=True)
+        seeder.add_entity(Game, 10, target=True)
+        seeder.resolve_targets('default')
+        self.assertEqual([order['quantity'] for order in seeder.orders], [3, 2])
+        seeder.execute()
+        self.assertEqual(Game.objects.count(), 10)
+
+    def test_count_rows_estimate(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 3)
+        seeder.execute()
+
+        self.assertEqual(count_rows(Game, 'default'), 3)
+        with mock.patch('django_seed.seeder.estimate_rows', return_value=5000):
+            self.assertEqual(count_rows(Game, 'default'), 3)
+            self.assertEqual(count_rows(Game, 'default', exact_limit=1000), 5000)
+
+
+class MultipleDatabasesTestCase(TestCase):
+    databases = {'default', 'other'}
+
+    def test_split_quantity(self):
+        self.assertEqual(split_quantity(10, {'a': 1, 'b': 1}), {'a': 5, 'b': 5})
+        self.assertEqual(split_quantity(10, {'a': 2, 'b': 1}), {'a': 7, 'b': 3})
+        self.assertEqual(split_quantity(1, {'a': 1, 'b': 1, 'c': 1}), {'a': 1, 'b': 0, 'c': 0})
+
+    def test_execute_databases(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 9)
+        seeder.add_entity(Player, 12, {'score': lambda x: 7})
+        results = seeder.execute(using={'default': 2, 'other': 1})
+
+        self.assertEqual(list(results), ['default', 'other'])
+        self.assertEqual(len(results['default'][Player]), 8)
+        self.assertEqual(len(results['other'][Player]), 4)
+        self.assertEqual(Game.objects.using('default').count(), 6)
+        self.assertEqual(Game.objects.using('other').count(), 3)
+        self.assertEqual(set(Player.objects.using('other').values_list('score', flat=True)), {7})
+
+        # Relations only point at the rows of their own database
+        games = set(Game.objects.using('other').values_list('pk', flat=True))
+        self.assertTrue(set(Player.objects.using('other').values_list('game_id', flat=True)) <= games)
+        self.assertEqual(seeder.orders, [])
+
+    def test_execute_databases_workers(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 2)
+        with self.assertRaises(SeederException):
+            seeder.execute(using=['default', 'other'], workers=2)
+
+
+class ThreadedDatabasesTestCase(TransactionTestCase):
+    databases = {'default', 'other'}
+
+    def test_execute_databases_threads(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 10)
+        seeder.add_entity(Player, 10)
+
+        threads = set()
+        execute = Seeder.execute
+
+        def record_thread(self, *args, **kwargs):
+            threads.add(threading.get_ident())
+            return execute(self, *args, **kwargs)
+
+        with mock.patch.object(Seeder, 'can_thread', return_value=True), \
+                mock.patch.object(Seeder, 'execute', record_thread):
+            results = seeder.execute(using=['default', 'other'])
+
+        # The calling thread, then one thread per database
+        self.assertEqual(len(threads), 3)
+        self.assertEqual(len(results['other'][Player]), 5)
+        self.assertEqual(Player.objects.using('default').count(), 5)
+
+
+@skipUnless('fork' in multiprocessing.get_all_start_methods(), "Worker processes are forked.")
+class ForkedWorkersTestCase(TransactionTestCase):
+    # 'other' is the file database of the tests, the worker processes open
+    # their own connection to it
+    databases = {'default', 'other'}
+
+    def test_execute_workers(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Pen, 3)
+        seeder.add_entity(Game, 3, {'title': lambda x: str(os.getpid())})
+        seeder.add_entity(Reporter, 3)
+        seeder.add_entity(Player, 6)
+        result = seeder.execute(using='other', workers=2, stats=True)
+
+        # Pen and Game, then Reporter and Player, are seeded by the workers
+        titles = set(Game.objects.using('other').values_list('title', flat=True))
+        self.assertNotIn(str(os.getpid()), titles)
+        self.assertEqual(FORK_STATE, {})
+
+        # The PKs and stats of the workers are merged back
+        games = set(Game.objects.using('other').values_list('pk', flat=True))
+        self.assertEqual(set(result[Game]), games)
+        self.assertEqual(len(result[Reporter]), 3)
+        self.assertTrue(set(Player.objects.using('other').values_list('game_id', flat=True)) <= games)
+        self.assertEqual((result.stats[Game].inserted, result.stats[Player].inserted), (3, 6))
+        self.assertEqual(seeder.orders, [])
+
+    def test_one_to_one_workers(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Pen, 10)
+        seeder.add_entity(Game, 2)
+        seeder.add_entity(Reporter, 8)
+        seeder.add_entity(Player, 2)
+        seeder.add_entity(Reporter, 2)
+        seeder.execute(using='other', workers=2)
+
+        # The second Reporter order only gets the pens the workers left
+        pens = list(Reporter.objects.using('other').values_list('pen_id', flat=True))
+        self.assertEqual(len(pens), 10)
+        self.assertEqual(len(set(pens)), 10)
+
+    def test_cycle_workers(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Team, 3)
+        seeder.add_entity(Member, 6)
+        seeder.add_entity(Pen, 2)
+        result = seeder.execute(using='other', workers=2)
+
+        # The parent fills the captains once the members were seeded
+        captains = set(Team.objects.using('other').values_list('captain_id', flat=True))
+        self.assertTrue(captains <= set(result[Member]))
+
+
+class PooledFormatterTestCase(TestCase):
+
+    def test_pool_values(self):
+        counter = iter(range(10 ** 6))
+        formatter = PooledFormatter(lambda x: next(counter), 10, refresh=5)
+
+        values = [formatter({}) for _ in range(20)]
+        self.assertTrue(set(values) <= set(range(14)))
+        self.assertEqual(len(formatter.values), 10)
+        # 10 values to fill the pool, one refresh every 5 draws
+        self.assertEqual(next(counter), 14)
+
+        column = formatter.batch(50)
+        self.assertEqual(len(column), 50)
+        self.assertEqual(next(counter), 25)
+
+    def test_pool_distinct_values(self):
+        formatter = PooledFormatter(lambda x: random.choice('ab'), 10)
+        formatter({})
+        self.assertEqual(sorted(formatter.values), ['a', 'b'])
+
+    def test_seeder_pool_size(self):
+        seeder = Seeder(fake, pool_size=5)
+        seeder.add_entity(Tag, 20)
+        seeder.add_entity(Customer, 20, pool_size={'comments': 0})
+        formatters = [order['entity'].field_formatters for order in seeder.orders]
+
+        self.assertNotIsInstance(formatters[0]['name'], PooledFormatter)
+        self.assertIsInstance(formatters[0]['description'], PooledFormatter)
+        self.assertIsInstance(formatters[1]['country'], PooledFormatter)
+        self.assertNotIsInstance(formatters[1]['comments'], PooledFormatter)
+
+        seeder.execute()
+        self.assertEqual(Tag.objects.count(), 20)
+        self.assertLessEqual(Customer.objects.values('country').distinct().count(), 5)
+
+    def test_seed_pool_size(self):
+        seeder = Seed.seeder(pool_size=50)
+        self.assertEqual(seeder.pool_size, 50)
+        self.assertIsNot(seeder, Seed.seeder())
+        self.assertIsNone(Seed.seeder().pool_size)
+        self.assertIs(seeder.faker, Seed.seeder().faker)
+
+
+class PrimaryKeyListTestCase(TestCase):
+
+    def test_contiguous_keys_are_ranges(self):
+        pks = PrimaryKeyList(range(1, 100001))
+        self.assertEqual(len(pks), 100000)
+        self.assertEqual(pks.segments, [range(1, 100001)])
+        self.assertEqual(pks[0], 1)
+        self.assertEqual(pks[-1], 100000)
+        self.assertIn(pks.sample(), range(1, 100001))
+
+    def test_mixed_keys(self):
+        values = [1, 2, 5, 9] + list(range(20, 60)) + [61, 7]
+        pks = PrimaryKeyList(values)
+        self.assertEqual(list(pks), values)
+        self.assertEqual([pks[i] for i in range(len(values))], values)
+        self.assertEqual(pks[2:6], values[2:6])
+        self.assertEqual(pks, values)
+
+    def test_uuid_keys(self):
+        values = [uuid.uuid4() for _ in range(10)]
+        pks = PrimaryKeyList(values)
+        self.assertEqual(list(pks), values)
+        self.assertEqual(pks[3], values[3])
+        self.assertEqual(len(pks.segments[0].data), 160)
+
+    def test_reservoir(self):
+        pks = PrimaryKeyList(range(10000), max_size=100)
+        self.assertEqual(len(pks), 100)
+        self.assertEqual(len(set(pks)), 100)
+        self.assertTrue(all(0 <= pk < 10000 for pk in pks))
+
+    def test_execute_reservoir(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 30)
+        seeder.add_entity(Player, 10)
+        result = seeder.execute(reservoir_size=5)
+
+        self.assertEqual(len(result[Game]), 5)
+        self.assertEqual(Game.objects.count(), 30)
+        self.assertTrue(set(Player.objects.values_list('game_id', flat=True)) <= set(result[Game]))
+
+
+class ExistingRowsTestCase(TestCase):
+
+    def test_execute_existing(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 5)
+        games = set(seeder.execute()[Game])
+
+        seeder.add_entity(Player, 10)
+        with self.assertRaises(SeederException):
+            seeder.execute()
+
+        seeder.add_entity(Player, 10)
+        # The PKs of the games are read once, then the players are inserted
+        # in a savepoint
+        with self.assertNumQueries(2 + 10 + 2):
+            result = seeder.execute(existing=True)
+
+        self.assertEqual(list(result), [Player])
+        self.assertEqual(len(result[Player]), 10)
+        self.assertTrue(set(Player.objects.values_list('game_id', flat=True)) <= games)
+
+    def test_existing_primary_keys(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 30)
+        games = set(seeder.execute()[Game])
+
+        existing = ExistingPrimaryKeys('default')
+        self.assertEqual(set(existing.get(Game)), games)
+        self.assertEqual(len(existing.get(Player)), 0)
+        with self.assertNumQueries(0):
+            existing.get(Game)
+
+        # The PKs span more values than the limit, pages are sampled
+        existing = ExistingPrimaryKeys('default', limit=10, page=3)
+        with self.assertNumQueries(1 + 3):
+            pks = existing.get(Game)
+        self.assertTrue(0 < len(pks) <= 9)
+        self.assertTrue(set(pks) <= games)
+
+
+class DeferredRelationsTestCase(TestCase):
+
+    def assertTree(self, pks):
+        parents = dict(Category.objects.filter(pk__in=list(pks)).values_list('pk', 'parent_id'))
+        first = min(parents)
+        self.assertEqual(parents[first], first)
+        for pk, parent in parents.items():
+            if pk != first:
+                self.assertLess(parent, pk)
+                self.assertIn(parent, parents)
+
+    def test_self_reference(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Category, 30)
+
+        with CaptureQueriesContext(connection) as queries:
+            chunks = list(seeder.iter_execute(chunk_size=10))
+
+        # One UPDATE per chunk fills the parents
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(updates), 3)
+        self.assertTree(pk for chunk in chunks for pk in chunk.pks)
+
+    def test_self_reference_engines(self):
+        seeder = Seeder(fake, engine='raw')
+        seeder.add_entity(Category, 10)
+        self.assertTree(seeder.execute()[Category])
+
+        # SQLite does not return the PKs of bulk inserts, the rows are
+        # inserted one at a time instead
+        seeder = Seeder(fake)
+        seeder.add_entity(Category, 10)
+        pks = seeder.execute(batch_size=5)[Category]
+        self.assertEqual(len(pks), 10)
+        self.assertEqual(Category.objects.filter(parent__in=pks).count(), 10)
+
+    def test_self_reference_not_deferrable(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Category, 2)
+        with mock.patch.object(connection.features, 'can_defer_constraint_checks', False):
+            with self.assertRaises(SeederException):
+                seeder.execute()
+
+    def test_cycle(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Team, 5)
+        seeder.add_entity(Member, 20)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = seeder.execute()
+
+        updates = [query for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Team.objects.filter(captain=None).exists())
+        self.assertTrue(set(Team.objects.values_list('captain_id', flat=True)) <= set(result[Member]))
+
+    def test_cycle_workers(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Team, 3)
+        seeder.add_entity(Member, 6)
+        seeder.execute(workers=2)
+        self.assertFalse(Team.objects.filter(captain=None).exists())
+
+    def test_forked_order_leaves_deferred_relations(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Team, 3)
+        seeder.add_entity(Member, 6)
+        seeder.defer_relations('default')
+        FORK_STATE.update(
+            seeder=seeder, level=seeder.orders[:1], using='default', inserted_entities={},
+            batch_size=None, reservoir_size=None, stats=None, pipeline=None, existing=None,
+        )
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                klass, pks, _, _ = execute_forked_order(0)
+        finally:
+            FORK_STATE.clear()
+
+        # The parent process fills them once the members exist
+        self.assertEqual((klass, len(pks)), (Team, 3))
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+
+    def test_export_self_reference(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Category, 5)
+        output = StringIO()
+        seeder.export(output, format='jsonl')
+
+        parents = [json.loads(line)['fields']['parent'] for line in output.getvalue().splitlines()]
+        self.assertEqual(parents[0], 1)
+        self.assertTrue(all(parent < pk for pk, parent in enumerate(parents[1:], 2)))
+
+    def test_export_cycle(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Team, 3)
+        seeder.add_entity(Member, 6)
+        output = StringIO()
+        seeder.export(output, format='jsonl')
+
+        objects = [json.loads(line) for line in output.getvalue().splitlines()]
+        captains = [obj['fields']['captain'] for obj in objects if obj['model'] == 'django_seed.team']
+        members = [obj['pk'] for obj in objects if obj['model'] == 'django_seed.member']
+        self.assertEqual(len(captains), 3)
+        self.assertTrue(all(captain in members for captain in captains))
+
+    def test_command_cycle(self):
+        from django.apps import apps
+
+        models = Command().sorted_models(apps.get_app_config('django_seed'))
+        self.assertLess(models.index(Team), models.index(Member))
+
 
 class APISeedTestCase(TestCase):
 
@@ -350,6 +1171,44 @@ class APISeedTestCase(TestCase):
         gen2 = self.seed2.faker(locale='it_IT')
         self.assertIs(gen1, gen2)
 
+    def test_faker_is_lazy(self):
+        faker = LazyFaker('it_IT', 42)
+        self.assertFalse(faker.loaded)
+
+        faker.seed_instance(7)
+        self.assertFalse(faker.loaded)
+        name = faker.name()
+        self.assertTrue(faker.loaded)
+
+        expected = Faker('it_IT')
+        expected.seed_instance(7)
+        self.assertEqual(name, expected.name())
+
+    def test_lazy_faker_special_methods(self):
+        faker = LazyFaker(['en_US', 'it_IT'])
+        self.assertIn('name', dir(faker))
+        self.assertIn('load', dir(faker))
+        self.assertTrue(faker['it_IT'].name())
+        self.assertIsInstance(faker.load(), Faker)
+
+    def test_import_does_not_load_faker_or_postgres(self):
+        script = (
+            "import sys, django\n"
+            "from django.conf import settings\n"
+            "settings.configure(INSTALLED_APPS=['django_seed'])\n"
+            "django.setup()\n"
+            "import django_seed.seeder, django_seed.management.commands.seed\n"
+            "from django_seed import Seed\n"
+            "Seed.seeder()\n"
+            "print(' '.join(sorted(\n"
+            "    name for name in ('faker', 'numpy', 'psycopg2', 'django.contrib.postgres')\n"
+            "    if name in sys.modules\n"
+            ")))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=root)
+        self.assertEqual(output.decode().strip(), '')
+
     def test_faker_cache_seeder(self):
         seeder1 = self.seed1.seeder()
         seeder2 = self.seed2.seeder()
@@ -365,10 +1224,182 @@ class APISeedTestCase(TestCase):
 
 
 class SeedCommandTestCase(TestCase):
+    databases = {'default', 'other'}
 
     def test_seed_command(self):
         call_command('seed', 'django_seed', number=10)
 
+    def test_seed_command_progress(self):
+        out = StringIO()
+        call_command('seed', 'django_seed', number=2, progress_interval=0, stdout=out)
+        output = out.getvalue()
+
+        self.assertNotIn('generated record with primary key', output)
+        self.assertIn('Seeded 2 Customers', output)
+        self.assertIn('rows/s', output)
+
+    def test_seed_command_pk_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pks.csv')
+            call_command('seed', 'django_seed', number=3, pk_output=path, stdout=StringIO())
+            with open(path) as pk_file:
+                lines = pk_file.read().splitlines()
+
+        customers = {'django_seed.Customer,{}'.format(pk) for pk in Customer.objects.values_list('pk', flat=True)}
+        self.assertTrue(customers <= set(lines))
+
+    def test_seed_command_verbosity_pks(self):
+        out = StringIO()
+        call_command('seed', 'django_seed', number=1, verbosity=3, stdout=out)
+        self.assertIn('Model Customer generated record with primary key', out.getvalue())
+
+    def test_seed_command_stats(self):
+        out = StringIO()
+        call_command('seed', 'django_seed', number=2, stats=True, stdout=out)
+        self.assertIn('Customer: 2 inserted, 0 skipped, 0 retried', out.getvalue())
+
+    def test_seed_command_cache_dir(self):
+        from django.apps import apps
+
+        with tempfile.TemporaryDirectory() as directory:
+            out = StringIO()
+            call_command('seed', 'django_seed', number=3, faker_seed=1, cache_dir=directory, stdout=out)
+            self.assertIn('Saved snapshot', out.getvalue())
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+            customers = list(Customer.objects.order_by('pk').values_list('pk', 'name', 'created_at'))
+            links = Newspaper.reporters.through.objects.count()
+            for model in apps.get_app_config('django_seed').get_models():
+                model.objects.all().delete()
+
+            out = StringIO()
+            call_command('seed', 'django_seed', number=3, faker_seed=1, cache_dir=directory, stdout=out)
+            self.assertIn('Restored snapshot', out.getvalue())
+            self.assertIn('Seeded 3 Customers', out.getvalue())
+
+            self.assertEqual(
+                list(Customer.objects.order_by('pk').values_list('pk', 'name', 'created_at')),
+                customers,
+            )
+            self.assertEqual(Newspaper.reporters.through.objects.count(), links)
+
+            # The restored rows are already there
+            cache = SnapshotCache(directory)
+            key = os.listdir(directory)[0][:-len('.snapshot')]
+            self.assertIsNone(cache.restore(key, 'default'))
+            self.assertEqual(Customer.objects.count(), 3)
+
+            # Another number of rows is another snapshot
+            for model in apps.get_app_config('django_seed').get_models():
+                model.objects.all().delete()
+            call_command('seed', 'django_seed', number=2, faker_seed=1, cache_dir=directory, stdout=StringIO())
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.snapshot')]), 2)
+
+    def test_snapshot_values(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Game, 3)
+        seeder.add_entity(Player, 3)
+        seeder.add_entity(Action, 3)
+        inserted_entities = seeder.execute()
+        fields = [field.attname for field in Action._meta.concrete_fields]
+        actions = list(Action.objects.order_by('pk').values_list(*fields))
+        games = list(Game.objects.order_by('pk').values_list('pk', 'random_binary', 'updated_time'))
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SnapshotCache(directory)
+            cache.save('key', inserted_entities, 'default')
+
+            # Lines of JSON, nothing is executed when they are read
+            with gzip.open(cache.path('key'), 'rt') as snapshot:
+                records = [json.loads(line) for line in snapshot]
+            self.assertEqual(records[0], ['table', 'django_seed.Game', records[0][2], True])
+            self.assertEqual(records[-1], ['end'])
+
+            Game.objects.all().delete()
+            restored = cache.restore('key', 'default')
+
+        self.assertEqual(set(restored), {Game, Player, Action})
+        self.assertEqual(list(Action.objects.order_by('pk').values_list(*fields)), actions)
+        self.assertEqual(
+            [(pk, bytes(binary), updated) for pk, binary, updated in
+             Game.objects.order_by('pk').values_list('pk', 'random_binary', 'updated_time')],
+            [(pk, bytes(binary), updated) for pk, binary, updated in games],
+        )
+
+    def test_seed_command_databases(self):
+        out = StringIO()
+        call_command('seed', 'django_seed', number=4, database=['default:3', 'other'], stdout=out)
+
+        self.assertEqual(Customer.objects.using('default').count(), 3)
+        self.assertEqual(Customer.objects.using('other').count(), 1)
+        self.assertIn('Seeded 4 Customers', out.getvalue())
+
+        call_command('seed', 'django_seed', number=2, database=['other'], stdout=StringIO())
+        self.assertEqual(Customer.objects.using('other').count(), 3)
+        self.assertEqual(Customer.objects.using('default').count(), 3)
+
+        with self.assertRaises(SeederCommandError):
+            call_command('seed', 'django_seed', number=2, database=['default', 'other'],
+                         cache_dir='cache', stdout=StringIO())
+        with self.assertRaises(SeederCommandError):
+            call_command('seed', 'django_seed', number=2, database=['default:many'], stdout=StringIO())
+
+        # Nothing was queued by the failed commands
+        self.assertEqual(Seed.seeder().orders, [])
+
+    def test_seed_command_target_count(self):
+        # Animal can only hold three rows, one per unique color
+        for color in (1, 2, 3):
+            Animal.objects.create(species='DG', first_color=color, second_color=color, farm=5)
+
+        call_command('seed', 'django_seed', target_count=2, stdout=StringIO())
+        self.assertEqual(Customer.objects.count(), 2)
+
+        out = StringIO()
+        call_command('seed', 'django_seed', target_count=3, stdout=out)
+        self.assertEqual(Customer.objects.count(), 3)
+        self.assertIn('Seeding 1 Customers', out.getvalue())
+        self.assertNotIn('Animals', out.getvalue())
+
+        out = StringIO()
+        call_command('seed', 'django_seed', target_count=3, stdout=out)
+        self.assertEqual(Customer.objects.count(), 3)
+        self.assertIn('Seeded 0 rows', out.getvalue())
+
+    def test_seed_command_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'seed.jsonl')
+            call_command('seed', 'django_seed', number=2, export=path, stdout=StringIO())
+            with open(path) as export:
+                lines = export.read().splitlines()
+
+        self.assertTrue(any('"model": "django_seed.customer"' in line for line in lines))
+        self.assertEqual(Customer.objects.count(), 0)
+
+    def test_progress_reporter(self):
+        out = StringIO()
+        now = [0.0]
+        reporter = ProgressReporter(OutputWrapper(out), 100, interval=5, clock=lambda: now[0])
+
+        now[0] = 2.0
+        reporter.update(Customer, 20)
+        self.assertEqual(out.getvalue(), '')
+
+        now[0] = 5.0
+        reporter.update(Customer, 30)
+        self.assertEqual(out.getvalue(), 'Seeded 50/100 rows, 10 rows/s, ETA 5s\n')
+
+        reporter.finish()
+        self.assertIn('Seeded 50 Customers\nSeeded 50 rows in 5.00s (10 rows/s)\n', out.getvalue())
+
+    def test_seed_command_batch_size(self):
+        call_command('seed', 'django_seed', number=10, batch_size=4, stdout=StringIO())
+        self.assertEqual(Customer.objects.count(), 10)
+        self.assertEqual(Player.objects.count(), 10)
+        # Every newspaper has reporters, the field is required
+        self.assertEqual(Newspaper.objects.count(), 10)
+        self.assertFalse(Newspaper.objects.filter(reporters=None).exists())
+
     def test_invalid_number_arg(self):
         try:
             call_command('seed', 'django_seed', number='asdf')
@@ -490,6 +1521,33 @@ class RelationshipTestCase(TestCase):
 
         self.assertRaises(SeederException, seeder.execute)
 
+    def test_one_to_one_shared_between_orders(self):
+        faker = fake
+        seeder = Seeder(faker)
+
+        seeder.add_entity(Pen, 6)
+        seeder.add_entity(Reporter, 3)
+        seeder.add_entity(Reporter, 3)
+
+        result = seeder.execute()
+        pens = Reporter.objects.filter(pk__in=result[Reporter]).values_list('pen_id', flat=True)
+        self.assertEqual(sorted(pens), sorted(result[Pen]))
+
+        # The pools do not keep the PKs of the run
+        pool = seeder.relation_pools[Reporter._meta.get_field('pen')]
+        self.assertEqual((pool.source, pool.unused), (None, []))
+
+    def test_one_to_one_not_enough_parents(self):
+        faker = fake
+        seeder = Seeder(faker)
+
+        seeder.add_entity(Pen, 2)
+        seeder.add_entity(Reporter, 3)
+
+        with self.assertRaisesRegex(SeederException, 'only 2 Pen available for 3 Reporter'):
+            seeder.execute()
+        self.assertEqual(Reporter.objects.count(), 0)
+
     def test_many_to_one(self):
         faker = fake
         seeder = Seeder(faker)
@@ -504,6 +1562,21 @@ class RelationshipTestCase(TestCase):
         self.assertNotEqual(Article.objects.get(id=results[Article][0]), None)
         self.assertEqual(Article.objects.get(id=results[Article][0]).reporter.pk, results[Reporter][0])
 
+    def test_relations_do_not_fetch_related_objects(self):
+        faker = fake
+        seeder = Seeder(faker)
+
+        seeder.add_entity(Pen, 5)
+        seeder.add_entity(Reporter, 5)
+        seeder.add_entity(Article, 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            results = seeder.execute()
+
+        selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(selects, [])
+        self.assertIn(Article.objects.get(id=results[Article][0]).reporter_id, results[Reporter])
+
     def test_many_to_one_wrong_order(self):
         faker = fake
         seeder = Seeder(faker)
@@ -529,6 +1602,30 @@ class RelationshipTestCase(TestCase):
         self.assertNotEqual(Article.objects.get(id=1), None)
         self.assertEqual(len(Reporter.objects.get(id=1).newspaper_set.all()), 1)
 
+    def test_many_to_many_bulk_through_rows(self):
+        faker = fake
+        seeder = Seeder(faker)
+
+        seeder.add_entity(Pen, 5)
+        seeder.add_entity(Reporter, 5)
+        seeder.add_entity(Article, 1)
+        seeder.add_entity(Newspaper, 4)
+
+        with CaptureQueriesContext(connection) as queries:
+            results = seeder.execute()
+
+        through_table = Newspaper.reporters.through._meta.db_table
+        through_inserts = [q['sql'] for q in queries if through_table in q['sql']]
+        # The links of the whole chunk are inserted at once
+        self.assertEqual(len(through_inserts), 1)
+        self.assertFalse(any(q['sql'].startswith('SELECT') for q in queries))
+
+        for newspaper in Newspaper.objects.filter(pk__in=results[Newspaper]):
+            reporters = list(newspaper.reporters.values_list('pk', flat=True))
+            self.assertTrue(reporters)
+            self.assertEqual(len(reporters), len(set(reporters)))
+            self.assertTrue(set(reporters) <= set(results[Reporter]))
+
     # TODO: This test should work once
     # https://github.com/Brobin/django-seed/issues/79 is resolved
 
@@ -656,3 +1753,87 @@ class UniquenessTestCase(TestCase):
         seeder.add_entity(Animal, 1)
 
         self.assertRaises(IntegrityError, seeder.execute)
+
+    def test_chunk_without_savepoint_per_row(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 20)
+
+        with CaptureQueriesContext(connection) as queries:
+            seeder.execute()
+
+        savepoints = [q['sql'] for q in queries if q['sql'].startswith('SAVEPOINT')]
+        self.assertEqual(len(savepoints), 1)
+        self.assertEqual(Tag.objects.count(), 20)
+
+    def test_failed_rows_are_bisected_and_regenerated(self):
+        names = iter(['a', 'a', 'b', 'c', 'c', 'd'])
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 4, {'name': lambda x: next(names)})
+
+        chunks = list(seeder.iter_execute())
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual((chunks[0].count, chunks[0].retried, chunks[0].failed), (4, 2, 0))
+        self.assertEqual(sorted(Tag.objects.values_list('name', flat=True)), ['a', 'b', 'c', 'd'])
+
+    def test_retry_budget_shared_by_chunks(self):
+        # The second chunk collides with the first one more often than it has
+        # rows, the unused retries of the order make up for it
+        names = iter(['n0', 'n1', 'n2', 'n3', 'n4'] + ['n0'] * 8 + ['u{}'.format(i) for i in range(100)])
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 20, {'name': lambda x: next(names)})
+
+        chunks = list(seeder.iter_execute(chunk_size=5))
+
+        self.assertEqual([chunk.count for chunk in chunks], [5, 5, 5, 5])
+        self.assertEqual(chunks[1].retried, 8)
+        self.assertEqual(Tag.objects.count(), 20)
+
+    def test_retry_budget_spent(self):
+        names = itertools.cycle('ab')
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 6, {'name': lambda x: next(names)})
+
+        seed_stats = SeedStats()
+        with mock.patch('builtins.print'):
+            chunks = list(seeder.iter_execute(chunk_size=2, stats=seed_stats))
+        stats = seed_stats[Tag]
+
+        self.assertEqual(sum(chunk.count for chunk in chunks), 2)
+        self.assertEqual((stats.inserted, stats.skipped, stats.retried), (2, 4, 6))
+
+    def test_failed_rows_are_reported(self):
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 2, {'name': 'a'})
+
+        with mock.patch('builtins.print') as printed:
+            chunks = list(seeder.iter_execute())
+
+        self.assertEqual((chunks[0].count, chunks[0].retried, chunks[0].failed), (1, 2, 1))
+        self.assertIn('2 rows retried, 1 failed', printed.call_args[0][0])
+
+    def test_stats(self):
+        names = iter(['a', 'a', 'b'])
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 2, {'name': lambda x: next(names)})
+
+        result = seeder.execute(stats=True)
+        stats = result.stats[Tag]
+
+        self.assertEqual(len(result[Tag]), 2)
+        self.assertEqual((stats.inserted, stats.skipped, stats.retried), (2, 0, 1))
+        self.assertEqual(set(stats.field_times), {'name', 'description'})
+        self.assertGreater(stats.db_time, 0)
+        self.assertIn('Tag: 2 inserted, 0 skipped, 1 retried', result.stats.format())
+
+    def test_stats_disabled(self):
+        formatter = lambda x: 'a'
+        entity = ModelSeeder(Tag)
+        entity.field_formatters = {'name': formatter}
+
+        self.assertIs(entity.compile()[0].generator, formatter)
+        self.assertIsNot(entity.compile(SeedStats().for_model(Tag))[0].generator, formatter)
+
+        seeder = Seeder(fake)
+        seeder.add_entity(Tag, 2)
+        self.assertIsNone(seeder.execute().stats)
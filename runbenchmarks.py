@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+"""
+Seeding benchmarks on the models of the test suite.
+
+    $ python runbenchmarks.py --rows=1000,10000 --output=results.json
+    $ python runbenchmarks.py --rows=1000,10000 --baseline=results.json
+    $ python runbenchmarks.py --database=postgres
+
+Every shape is seeded with every engine at every number of rows, and the
+rows/sec, queries per row and peak memory (tracemalloc, in a second run so
+that it does not slow down the timed one) are recorded. With --baseline, the
+results are compared with a previous --output file and the script exits with
+an error when the throughput dropped or the number of queries grew.
+
+The time it takes to import django_seed and its seed command is measured
+too, and the run fails when importing them loads Faker, NumPy or the
+PostgreSQL support.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+
+
+# The models seeded by each shape, with the number of rows of each model
+# relative to the number of rows of the benchmark
+SHAPES = {
+    'wide': [('Game', 1)],
+    'fk_chain': [('Game', 0.01), ('Player', 0.1), ('Action', 1)],
+    'one_to_one': [('Pen', 1), ('Reporter', 1)],
+    'many_to_many': [('Pen', 0.1), ('Reporter', 0.1), ('Article', 0.1), ('Newspaper', 1)],
+    'unique': [('Tag', 1)],
+}
+
+# Engine and batch size of each mode
+MODES = {
+    'orm': ('orm', None),
+    'batch': ('orm', 1000),
+    'raw': ('raw', None),
+}
+
+POSTGRES = {
+    'ENGINE': 'django.db.backends.postgresql_psycopg2',
+    'NAME': 'dbtest',
+    'USER': 'postgres',
+    'PASSWORD': 'postgres',
+    'HOST': 'localhost',
+    'PORT': '5432',
+}
+
+
+# Modules that must only be imported once a seed needs them
+LAZY_MODULES = ('faker', 'numpy', 'psycopg2', 'django.contrib.postgres')
+
+IMPORT_SCRIPT = """
+import sys, time, django
+from django.conf import settings
+settings.configure(INSTALLED_APPS=['django_seed'])
+django.setup()
+started = time.perf_counter()
+import django_seed.seeder, django_seed.management.commands.seed
+from django_seed import Seed
+Seed.seeder()
+print(time.perf_counter() - started)
+print(' '.join(name for name in {} if name in sys.modules))
+""".format(LAZY_MODULES)
+
+
+def import_time(runs=5):
+    """
+    Import django_seed in fresh interpreters
+    :rtype: A dict of the fastest import time and the lazy modules that were
+    imported
+    """
+    times = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', IMPORT_SCRIPT],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).decode().splitlines()
+        times.append(float(output[0]))
+        loaded = output[1].split() if len(output) > 1 else []
+
+    result = {'seconds': round(min(times), 4), 'loaded': loaded}
+    print('import     {:.1f} ms, loaded: {}'.format(
+        result['seconds'] * 1000, ', '.join(loaded) or 'nothing lazy',
+    ))
+    return result
+
+
+def postgres_available():
+    try:
+        import psycopg2
+        psycopg2.connect(
+            dbname='postgres', user=POSTGRES['USER'], password=POSTGRES['PASSWORD'],
+            host=POSTGRES['HOST'], port=POSTGRES['PORT'], connect_timeout=2,
+        ).close()
+    except Exception as e:
+        print(f'Skipping postgres benchmarks: {e}')
+        return False
+    return True
+
+
+def configure(databases):
+    settings.configure(
+        DATABASES=databases,
+        INSTALLED_APPS=(
+            'django_seed',
+        ),
+        SITE_ID=1,
+        SECRET_KEY='benchmarks',
+        DEFAULT_AUTO_FIELD='django.db.models.AutoField',
+    )
+    django.setup()
+
+
+class QueryCounter(object):
+    """
+    Connection execute wrapper counting the queries, an executemany() call
+    counts as a single query
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def seed(alias, shape, mode, rows):
+    """
+    Seed a shape once
+    :rtype: A tuple of the number of inserted rows, the seconds it took and
+    the number of queries
+    """
+    from django.apps import apps
+    from django.db import connections
+    from faker import Faker
+    from django_seed.seeder import Seeder
+
+    engine, batch_size = MODES[mode]
+    faker = Faker()
+    faker.seed_instance(0)
+    random.seed(0)
+
+    seeder = Seeder(faker, engine=engine)
+    models = []
+    for name, ratio in SHAPES[shape]:
+        model = apps.get_model('django_seed', name)
+        models.append(model)
+        seeder.add_entity(model, max(int(rows * ratio), 1))
+
+    counter = QueryCounter()
+    connection = connections[alias]
+    with connection.execute_wrapper(counter):
+        started = time.perf_counter()
+        seeder.execute(using=alias, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+
+    inserted = sum(model.objects.using(alias).count() for model in models)
+    return inserted, elapsed, counter.count
+
+
+def flush(alias):
+    from django.core.management import call_command
+    call_command('flush', database=alias, interactive=False, verbosity=0)
+
+
+def run(alias, shapes, modes, sizes, memory=True):
+    from django.db import connections
+    from django_seed.seeder import bulk_insert_returns_pks
+
+    results = []
+    connection = connections[alias]
+
+    for shape in shapes:
+        for mode in modes:
+            # Related rows can only be picked from batches when the backend
+            # returns the primary keys of bulk inserts
+            if (mode == 'batch' and len(SHAPES[shape]) > 1 and
+                    not bulk_insert_returns_pks(connection)):
+                continue
+
+            for rows in sizes:
+                flush(alias)
+                inserted, elapsed, queries = seed(alias, shape, mode, rows)
+
+                peak = None
+                if memory:
+                    flush(alias)
+                    tracemalloc.start()
+                    seed(alias, shape, mode, rows)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+
+                result = {
+                    'database': connection.vendor,
+                    'shape': shape,
+                    'mode': mode,
+                    'rows': rows,
+                    'inserted': inserted,
+                    'seconds': round(elapsed, 4),
+                    'rows_per_second': round(inserted / elapsed, 1) if elapsed else None,
+                    'queries_per_row': round(queries / inserted, 4) if inserted else None,
+                    'peak_memory': peak,
+                }
+                results.append(result)
+                report(result)
+
+    flush(alias)
+    return results
+
+
+def key(result):
+    return result['database'], result['shape'], result['mode'], result['rows']
+
+
+def report(result):
+    line = '{database:<10} {shape:<13} {mode:<6} {rows:>8} {rows_per_second:>11} rows/s {queries_per_row:>8} queries/row'.format(**result)
+    if result['peak_memory'] is not None:
+        line += ' {:>9.1f} MB'.format(result['peak_memory'] / 2 ** 20)
+    print(line)
+
+
+def compare_import(result, baseline, tolerance):
+    """
+    Compare the import time with a baseline
+    :rtype: A list of the regressions
+    """
+    regressions = []
+    if result['loaded']:
+        regressions.append('import: loaded {}'.format(', '.join(result['loaded'])))
+
+    before = baseline.get('import')
+    if before and before['seconds']:
+        speed = before['seconds'] / result['seconds']
+        print('import     {:.2f}x'.format(speed))
+        if speed < 1 - tolerance:
+            regressions.append('import: {:.1f} -> {:.1f} ms'.format(
+                before['seconds'] * 1000, result['seconds'] * 1000,
+            ))
+    return regressions
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare the results with a baseline
+    :rtype: A list of the regressions
+    """
+    previous = {key(result): result for result in baseline['results']}
+    regressions = []
+
+    for result in results:
+        before = previous.get(key(result))
+        if before is None or not before['rows_per_second'] or not result['rows_per_second']:
+            continue
+
+        speed = result['rows_per_second'] / before['rows_per_second']
+        print('{:<10} {:<13} {:<6} {:>8} {:>7.2f}x rows/s, {} -> {} queries/row'.format(
+            *key(result), speed, before['queries_per_row'], result['queries_per_row'],
+        ))
+
+        if speed < 1 - tolerance:
+            regressions.append('{} {} {} {}: {:.2f}x rows/s'.format(*key(result), speed))
+        if (result['queries_per_row'] or 0) > (before['queries_per_row'] or 0) * (1 + tolerance):
+            regressions.append('{} {} {} {}: {} -> {} queries/row'.format(
+                *key(result), before['queries_per_row'], result['queries_per_row'],
+            ))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark django-seed.')
+    parser.add_argument('--rows', default='1000,10000',
+                        help='Comma separated numbers of rows to seed per shape.')
+    parser.add_argument('--shapes', default=','.join(SHAPES),
+                        help='Comma separated shapes to seed.')
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help='Comma separated insert modes.')
+    parser.add_argument('--database', action='append', default=[],
+                        help='Also benchmark on postgres when it is available.')
+    parser.add_argument('--no-memory', action='store_false', dest='memory',
+                        help='Do not measure the peak memory.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', help='Compare the results with this JSON file.')
+    parser.add_argument('--tolerance', default=0.2, type=float,
+                        help='Allowed relative regression (default 0.2).')
+    args = parser.parse_args()
+
+    imports = import_time()
+
+    directory = tempfile.mkdtemp()
+    databases = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(directory, 'benchmarks.sqlite3'),
+            'TEST': {'NAME': os.path.join(directory, 'test_benchmarks.sqlite3')},
+        }
+    }
+    if 'postgres' in args.database and postgres_available():
+        databases['postgres'] = POSTGRES
+    configure(databases)
+
+    # Creates the tables of the test models
+    from django.test.utils import setup_databases, teardown_databases
+    import django_seed.tests  # noqa: F401
+    old_config = setup_databases(verbosity=0, interactive=False)
+
+    results = []
+    try:
+        for alias in databases:
+            results += run(
+                alias,
+                args.shapes.split(','),
+                args.modes.split(','),
+                [int(rows) for rows in args.rows.split(',')],
+                args.memory,
+            )
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'django': django.get_version(), 'import': imports, 'results': results},
+                      output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            baseline = json.load(baseline)
+        regressions = compare_import(imports, baseline, args.tolerance)
+        regressions += compare(results, baseline, args.tolerance)
+        if regressions:
+            print('Regressions:')
+            for regression in regressions:
+                print('  ' + regression)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
+import os
 import sys
+import tempfile
 import django
 from django.conf import settings
 from django.test.utils import get_runner
@@ -43,7 +45,16 @@ if not settings.configured:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': ':memory:',
-        }
+        },
+        # Second database for the tests seeding several databases at once,
+        # in a file so that worker processes can share it
+        'other': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+            'TEST': {
+                'NAME': os.path.join(tempfile.mkdtemp(), 'other.sqlite3'),
+            },
+        },
     }
 
     # Used for tests in Github Actions
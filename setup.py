@@ -57,6 +57,7 @@ setup(
     keywords='faker fixtures data test django seed',
     long_description=open('README.rst', 'rb').read().decode('utf-8'),
     install_requires=['django>=1.11', 'Faker>=0.7.7', 'toposort>=1.5'],
+    extras_require={'numpy': ['numpy>=1.17']},
     tests_require=['django>=1.11', 'fake-factory>=0.5.0',
                    'coverage', 'django-nose'],
     test_suite="runtests.runtests",